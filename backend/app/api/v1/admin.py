@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi.responses import FileResponse
+import hmac
+from app.config import get_settings
+from app import profiling
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+settings = get_settings()
+
+def is_admin(token: str) -> bool:
+    return bool(settings.ADMIN_TOKEN) and hmac.compare_digest(token, settings.ADMIN_TOKEN)
+
+async def require_admin(x_admin_token: str = Header("")):
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str):
+    """Download a request profile captured with the X-Profile header (collapsed-stack format)."""
+    path = profiling.profile_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"profile-{profile_id}.txt")
@@ -1,19 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from pydantic import BaseModel, EmailStr
-from typing import Optional
-from app.database import get_db
-from app.models.interview import Interview, Submission, TokenBalance
-from app.services.ai_service import generate_questions, evaluate_submission
-from app.metrics import interviews_created, submissions_total, tokens_consumed, free_trial_used
+from sqlalchemy import select, update, or_, and_, literal
+from sqlalchemy.dialects.sqlite import insert
+from pydantic import BaseModel, EmailStr, Field
+from typing import AsyncIterator, Literal, Optional
+import asyncio
+import base64
+import csv
+import io
+import json
+import logging
+import math
+import uuid
+import zlib
+from datetime import datetime
+from app.config import get_settings
+from app.database import get_db, get_read_db, async_session, read_session
+from app.models.interview import Interview, Submission, DraftAnswer, generate_uuid, generate_access_code
+from app.services import (
+    evaluation_worker, question_cache, question_bank, interview_stats, interview_view_cache, llm_client, rate_limit,
+    submission_search, maintenance
+)
+from app.services.ai_service import generate_questions, stream_questions, uses_fallback
+from app.services.tokens import reserve_tokens, refund_tokens
+from app.metrics import interviews_created, submissions_total, interview_view_requests, results_exported_rows
 
 router = APIRouter(prefix="/interviews", tags=["interviews"])
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
 class CreateInterviewRequest(BaseModel):
     job_title: str
     job_requirements: str
     key_skills: list[str] = []
+    use_cache: bool = True  # set False to always generate fresh questions
 
 class CreateInterviewResponse(BaseModel):
     id: str
@@ -22,16 +43,38 @@ class CreateInterviewResponse(BaseModel):
     results_url: str
     questions: list[dict]
 
+class BulkCreateInterviewRequest(BaseModel):
+    interviews: list[CreateInterviewRequest] = Field(..., min_length=1, max_length=settings.BULK_CREATE_MAX_ITEMS)
+
+class BulkCreateItemResult(BaseModel):
+    index: int
+    success: bool
+    interview: Optional[CreateInterviewResponse] = None
+    error: Optional[str] = None
+
+class BulkCreateInterviewResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkCreateItemResult]
+
 class SubmitAnswersRequest(BaseModel):
     candidate_name: str
     candidate_email: EmailStr
     answers: list[dict]  # [{question_id, answer}]
+    draft_id: Optional[str] = None  # answers saved via PUT .../drafts/{draft_id}/answers/{question_id}
+
+class DraftAnswerRequest(BaseModel):
+    answer: str = Field(..., max_length=20000)
 
 class InterviewDetails(BaseModel):
     id: str
     job_title: str
     questions: list[dict]
 
+class SubmissionStatus(BaseModel):
+    id: str
+    status: str  # pending, completed
+
 class SubmissionResult(BaseModel):
     id: str
     candidate_name: str
@@ -42,167 +85,477 @@ class SubmissionResult(BaseModel):
     scores: list[dict]
     submitted_at: str
 
-FREE_INTERVIEWS_LIMIT = 1
+class SubmissionDetails(BaseModel):
+    id: str
+    scores: list[dict]
+    answers: list[dict]
 
-async def check_tokens(device_id: str, db: AsyncSession) -> tuple[bool, str]:
-    """Check if device has tokens available. Returns (allowed, message)."""
-    result = await db.execute(select(TokenBalance).where(TokenBalance.device_id == device_id))
-    balance = result.scalar_one_or_none()
-    
-    if not balance:
-        # New device, allow one free interview
-        balance = TokenBalance(device_id=device_id, free_trial_used=0, balance=0)
-        db.add(balance)
-        await db.commit()
-        return True, "free_trial"
-    
-    # Check free trial
-    if balance.free_trial_used < FREE_INTERVIEWS_LIMIT:
-        return True, "free_trial"
-    
-    # Check paid tokens
-    if balance.balance > 0:
-        return True, "paid"
-    
-    return False, "no_tokens"
+class SearchHit(BaseModel):
+    submission_id: str
+    candidate_name: str
+    candidate_email: str
+    overall_score: float
+    recommendation: str
+    matched_in: Literal["answers", "comments", "summary"]
+    snippet: str  # HTML-escaped, matches wrapped in <mark>
 
-async def consume_token(device_id: str, token_type: str, db: AsyncSession):
-    """Consume a token or free trial."""
-    result = await db.execute(select(TokenBalance).where(TokenBalance.device_id == device_id))
-    balance = result.scalar_one_or_none()
-    
-    if token_type == "free_trial":
-        balance.free_trial_used += 1
-        free_trial_used.labels(tool="ai-interviewer").inc()
-    else:
-        balance.balance -= 1
-        tokens_consumed.labels(tool="ai-interviewer").inc()
-    
-    await db.commit()
+class SearchResponse(BaseModel):
+    total: int
+    hits: list[SearchHit]
 
-@router.post("", response_model=CreateInterviewResponse)
+@router.post("", response_model=CreateInterviewResponse, dependencies=[Depends(rate_limit.limit("device", "ip"))])
 async def create_interview(
     request: CreateInterviewRequest,
     x_device_id: str = Header(...),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new interview session with AI-generated questions."""
-    # Check tokens
-    allowed, token_type = await check_tokens(x_device_id, db)
-    if not allowed:
+    # Shed load before reserving a token when the LLM queue is already full
+    llm_client.check_admission("generate_questions")
+    # Reserve a token up front and commit, so the write lock is not held across the LLM call
+    reservation = await reserve_tokens(x_device_id, db)
+    if reservation is None:
         raise HTTPException(
             status_code=402,
             detail="No interviews remaining. Please purchase more interviews."
         )
+    await db.commit()
     
-    # Generate questions
-    questions = await generate_questions(
-        request.job_title,
-        request.job_requirements,
-        request.key_skills
-    )
+    try:
+        # Generate questions (or reuse them for an identical job spec)
+        questions = await question_cache.get_questions(
+            request.job_title,
+            request.job_requirements,
+            request.key_skills,
+            db,
+            use_cache=request.use_cache
+        )
+        
+        interview = Interview(
+            job_title=request.job_title,
+            job_requirements=request.job_requirements,
+            key_skills=request.key_skills,
+            questions=questions
+        )
+        db.add(interview)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        await refund_tokens(x_device_id, *reservation, db)
+        await db.commit()
+        raise
     
-    # Create interview
-    interview = Interview(
-        job_title=request.job_title,
-        job_requirements=request.job_requirements,
-        key_skills=request.key_skills,
-        questions=questions
-    )
-    db.add(interview)
+    interviews_created.labels(tool="ai-interviewer").inc()
     
-    # Consume token
-    await consume_token(x_device_id, token_type, db)
+    return _create_response(interview)
+
+@router.post("/bulk", response_model=BulkCreateInterviewResponse)
+async def create_interviews_bulk(
+    request: BulkCreateInterviewRequest,
+    http_request: Request,
+    x_device_id: str = Header(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many interviews at once.
+
+    Tokens for the whole batch are reserved in one transaction, questions are
+    generated concurrently (at most BULK_CREATE_CONCURRENCY at a time) and all
+    interviews are inserted together. Items whose generation fails are reported
+    individually and their tokens refunded.
+    """
+    items = request.interviews
+    # Each posting counts against the rate limits (capped at the burst size)
+    rate_limit.take(rate_limit.request_keys(http_request, "device", "ip"), cost=len(items))
+    llm_client.check_admission("generate_questions")
+    reservation = await reserve_tokens(x_device_id, db, count=len(items))
+    if reservation is None:
+        raise HTTPException(
+            status_code=402,
+            detail=f"Not enough interviews remaining for {len(items)} postings. Please purchase more interviews."
+        )
     await db.commit()
-    await db.refresh(interview)
     
-    interviews_created.labels(tool="ai-interviewer").inc()
+    try:
+        # Cache lookups share this session; only misses go to the LLM
+        keys = [question_cache.cache_key(i.job_title, i.job_requirements, i.key_skills) for i in items]
+        questions: list[Optional[list[dict]]] = [
+            await question_cache.get_cached(key, db) if item.use_cache else None
+            for item, key in zip(items, keys)
+        ]
+        cached = [q is not None for q in questions]
+        # End the lookup transaction so the writer connection is not held during generation
+        await db.commit()
+        
+        semaphore = asyncio.Semaphore(settings.BULK_CREATE_CONCURRENCY)
+        
+        banked: set[int] = set()
+        
+        async def generate(index: int) -> list[dict]:
+            item = items[index]
+            if item.use_cache:
+                found = await question_bank.find(item.job_title, item.job_requirements, item.key_skills)
+                if found is not None:
+                    banked.add(index)
+                    return found
+            async with semaphore:
+                return await generate_questions(item.job_title, item.job_requirements, item.key_skills)
+        
+        # Identical specs in the batch share one LLM call through single-flight
+        misses = [index for index, q in enumerate(questions) if q is None]
+        generated = await asyncio.gather(*(generate(index) for index in misses), return_exceptions=True)
+        errors: dict[int, str] = {}
+        for index, outcome in zip(misses, generated):
+            if isinstance(outcome, llm_client.LLMOverloadedError):
+                errors[index] = "The AI service is busy. The interview credit was refunded; please retry this posting shortly."
+            elif isinstance(outcome, llm_client.LLMUnavailableError):
+                errors[index] = "The AI service is temporarily unavailable. The interview credit was refunded; please retry this posting shortly."
+            elif isinstance(outcome, BaseException):
+                logger.warning("Bulk question generation failed for item %d: %r", index, outcome)
+                errors[index] = "Failed to generate interview questions. The interview credit was refunded."
+            else:
+                questions[index] = outcome
+        
+        rows = [
+            {
+                "id": generate_uuid(),
+                "hr_access_code": generate_access_code(),
+                "job_title": item.job_title,
+                "job_requirements": item.job_requirements,
+                "key_skills": item.key_skills,
+                "questions": questions[index]
+            }
+            for index, item in enumerate(items) if index not in errors
+        ]
+        if rows:
+            await db.execute(insert(Interview), rows)
+        for index, item in enumerate(items):
+            if index not in errors and item.use_cache and not cached[index] and not uses_fallback(questions[index], item.job_title):
+                await question_cache.store(keys[index], questions[index], db)
+                if index not in banked:
+                    await question_bank.add(item.job_title, item.job_requirements, item.key_skills, questions[index], db)
+        
+        # Failed items get their tokens back, paid tokens first
+        refund_paid = min(len(errors), reservation[1])
+        await refund_tokens(x_device_id, len(errors) - refund_paid, refund_paid, db)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        await refund_tokens(x_device_id, *reservation, db)
+        await db.commit()
+        raise
+    
+    interviews_created.labels(tool="ai-interviewer").inc(len(rows))
     
+    created = iter(rows)
+    results = [
+        BulkCreateItemResult(index=index, success=False, error=errors[index]) if index in errors
+        else BulkCreateItemResult(index=index, success=True, interview=_create_response(Interview(**next(created))))
+        for index in range(len(items))
+    ]
+    return BulkCreateInterviewResponse(created=len(rows), failed=len(errors), results=results)
+
+def _create_response(interview: Interview) -> CreateInterviewResponse:
     return CreateInterviewResponse(
         id=interview.id,
         hr_access_code=interview.hr_access_code,
         interview_url=f"/interview/{interview.id}",
         results_url=f"/results/{interview.id}?code={interview.hr_access_code}",
-        questions=questions
+        questions=interview.questions
     )
 
-@router.get("/{interview_id}", response_model=InterviewDetails)
-async def get_interview(interview_id: str, db: AsyncSession = Depends(get_db)):
-    """Get interview details for candidates to answer."""
-    result = await db.execute(select(Interview).where(Interview.id == interview_id))
-    interview = result.scalar_one_or_none()
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _stream_interview(request: CreateInterviewRequest, device_id: str, reservation: tuple[int, int]) -> AsyncIterator[str]:
+    # The request's session is closed before streaming starts, so use short-lived ones
+    created = False
+    try:
+        cached = None
+        key = question_cache.cache_key(request.job_title, request.job_requirements, request.key_skills)
+        if request.use_cache:
+            async with async_session() as db:
+                cached = await question_cache.get_cached(key, db)
+                await db.commit()
+        
+        banked = None
+        if request.use_cache and cached is None:
+            banked = await question_bank.find(request.job_title, request.job_requirements, request.key_skills)
+        
+        questions = []
+        if cached is not None or banked is not None:
+            questions = cached if cached is not None else banked
+            for question in questions:
+                yield _sse("question", question)
+        else:
+            async for question in stream_questions(request.job_title, request.job_requirements, request.key_skills):
+                questions.append(question)
+                yield _sse("question", question)
+        
+        async with async_session() as db:
+            interview = Interview(
+                job_title=request.job_title,
+                job_requirements=request.job_requirements,
+                key_skills=request.key_skills,
+                questions=questions
+            )
+            db.add(interview)
+            if request.use_cache and cached is None and not uses_fallback(questions, request.job_title):
+                await question_cache.store(key, questions, db)
+                if banked is None:
+                    await question_bank.add(request.job_title, request.job_requirements, request.key_skills, questions, db)
+            await db.commit()
+        created = True
+        interviews_created.labels(tool="ai-interviewer").inc()
+        
+        yield _sse("done", _create_response(interview).model_dump())
+    except llm_client.LLMOverloadedError as e:
+        yield _sse("error", {
+            "detail": "The AI service is busy. Your interview credit was not used; please try again shortly.",
+            "retry_after": math.ceil(e.retry_after)
+        })
+    except llm_client.LLMUnavailableError as e:
+        yield _sse("error", {
+            "detail": "The AI service is temporarily unavailable. Your interview credit was not used; please try again shortly.",
+            "retry_after": math.ceil(e.retry_after)
+        })
+    except Exception:
+        logger.exception("Streaming interview creation failed")
+        yield _sse("error", {"detail": "Failed to generate interview questions. Your interview credit was not used."})
+    finally:
+        if not created:
+            # Also runs when the client disconnects mid-stream
+            await asyncio.shield(_refund(device_id, reservation))
+
+async def _refund(device_id: str, reservation: tuple[int, int]):
+    async with async_session() as db:
+        await refund_tokens(device_id, *reservation, db)
+        await db.commit()
+
+@router.post("/stream", dependencies=[Depends(rate_limit.limit("device", "ip"))])
+async def create_interview_stream(
+    request: CreateInterviewRequest,
+    x_device_id: str = Header(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create an interview, streaming each question as a Server-Sent Event as soon as it is generated.
+
+    Emits `question` events, then `done` with the same payload as POST /interviews
+    (or `error`, in which case the token is refunded).
+    """
+    llm_client.check_admission("generate_questions")
+    reservation = await reserve_tokens(x_device_id, db)
+    if reservation is None:
+        raise HTTPException(
+            status_code=402,
+            detail="No interviews remaining. Please purchase more interviews."
+        )
+    await db.commit()
     
-    if not interview:
+    return StreamingResponse(
+        _stream_interview(request, x_device_id, reservation),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match (CDNs may weaken ETags when compressing)
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+@router.get("/{interview_id}", response_model=InterviewDetails)
+async def get_interview(
+    interview_id: str,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get interview details for candidates to answer.
+
+    Served from a per-process cache of the serialized view, with an ETag so
+    browsers and CDNs can revalidate with If-None-Match.
+    """
+    view, hit = await interview_view_cache.get_view(interview_id, db)
+    if view is None:
         raise HTTPException(status_code=404, detail="Interview not found")
     
-    # Return questions without expected_focus (that's for HR only)
-    questions = [{"id": q["id"], "text": q["text"]} for q in interview.questions]
-    
-    return InterviewDetails(
-        id=interview.id,
-        job_title=interview.job_title,
-        questions=questions
-    )
+    headers = {
+        "ETag": view.etag,
+        "Cache-Control": f"public, max-age={settings.INTERVIEW_VIEW_MAX_AGE_SECONDS}"
+    }
+    if _etag_matches(if_none_match, view.etag):
+        interview_view_requests.labels(tool="ai-interviewer", result="not_modified").inc()
+        return Response(status_code=304, headers=headers)
+    interview_view_requests.labels(tool="ai-interviewer", result="hit" if hit else "miss").inc()
+    return Response(content=view.body, media_type="application/json", headers=headers)
 
-@router.post("/{interview_id}/submit")
+@router.post("/{interview_id}/submit", dependencies=[Depends(rate_limit.limit("interview", "ip"))])
 async def submit_answers(
     interview_id: str,
     request: SubmitAnswersRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db)
 ):
-    """Submit candidate answers and get AI evaluation."""
-    result = await db.execute(select(Interview).where(Interview.id == interview_id))
-    interview = result.scalar_one_or_none()
-    
-    if not interview:
+    """Submit candidate answers. Evaluation runs in the background.
+
+    Checks run on the read pool; the writer only runs the insert (and the draft
+    handover), and stats and search entries are written behind it.
+    """
+    already_submitted = HTTPException(status_code=400, detail="You have already submitted answers for this interview")
+    duplicate = select(Submission.id).where(
+        Submission.interview_id == interview_id,
+        Submission.candidate_email == request.candidate_email
+    ).exists()
+    result = await read_db.execute(
+        select(Interview.id, duplicate).where(Interview.id == interview_id)
+    )
+    row = result.one_or_none()
+    await read_db.commit()
+    if row is None:
         raise HTTPException(status_code=404, detail="Interview not found")
+    if row[1]:
+        raise already_submitted
     
-    # Check if already submitted
-    existing = await db.execute(
-        select(Submission).where(
-            Submission.interview_id == interview_id,
-            Submission.candidate_email == request.candidate_email
+    # Persist as pending; the evaluation worker fills in the scores. The duplicate
+    # check is repeated in the insert, for a submission committed since the read.
+    submission_id = generate_uuid()
+    values = select(
+        literal(submission_id),
+        literal(interview_id),
+        literal(request.candidate_name),
+        literal(request.candidate_email),
+        literal(request.answers, type_=Submission.answers.type),
+        literal("pending")
+    ).where(~duplicate)
+    result = await db.execute(
+        insert(Submission).from_select(
+            ["id", "interview_id", "candidate_name", "candidate_email", "answers", "recommendation"], values
         )
     )
-    if existing.scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="You have already submitted answers for this interview")
-    
-    # Evaluate with AI
-    interview_dict = {
-        "job_title": interview.job_title,
-        "job_requirements": interview.job_requirements,
-        "questions": interview.questions
-    }
-    evaluation = await evaluate_submission(interview_dict, request.answers)
-    
-    # Create submission
-    submission = Submission(
-        interview_id=interview_id,
-        candidate_name=request.candidate_name,
-        candidate_email=request.candidate_email,
-        answers=request.answers,
-        scores=evaluation.get("scores", []),
-        overall_score=evaluation.get("overall_score", 0),
-        recommendation=evaluation.get("recommendation", "pending"),
-        ai_summary=evaluation.get("summary", "")
-    )
-    db.add(submission)
+    if not result.rowcount:
+        await db.rollback()
+        raise already_submitted
+    if request.draft_id:
+        # Hand the draft answers (and any scores they already have) to this submission
+        await db.execute(
+            update(DraftAnswer)
+            .where(
+                DraftAnswer.draft_id == request.draft_id,
+                DraftAnswer.interview_id == interview_id,
+                DraftAnswer.submission_id.is_(None)
+            )
+            .values(submission_id=submission_id)
+        )
     await db.commit()
     
+    maintenance.submission_added(interview_id, submission_id)
+    evaluation_worker.enqueue(submission_id)
     submissions_total.labels(tool="ai-interviewer").inc()
     
     return {
         "success": True,
+        "submission_id": submission_id,
+        "status": "pending",
         "message": "Thank you for completing the interview. The hiring team will review your responses."
     }
 
+@router.put("/{interview_id}/drafts/{draft_id}/answers/{question_id}", dependencies=[Depends(rate_limit.limit("draft"))])
+async def save_draft_answer(
+    interview_id: str,
+    draft_id: str,
+    question_id: int,
+    request: DraftAnswerRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Save one answer while the candidate is still answering and score it in the background.
+
+    `draft_id` is generated by the candidate's browser and passed again on submit,
+    so the final evaluation can reuse scores of answers that did not change.
+    """
+    try:
+        draft_id = str(uuid.UUID(draft_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid draft id")
+    
+    result = await db.execute(select(Interview.questions).where(Interview.id == interview_id))
+    questions = result.scalar_one_or_none()
+    if questions is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    if not any(q["id"] == question_id for q in questions):
+        raise HTTPException(status_code=404, detail="Question not found")
+    
+    stmt = insert(DraftAnswer).values(
+        draft_id=draft_id,
+        question_id=question_id,
+        interview_id=interview_id,
+        answer=request.answer
+    )
+    # Only touch the row if the answer changed and the draft has not been submitted yet
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DraftAnswer.draft_id, DraftAnswer.question_id],
+        set_={"answer": stmt.excluded.answer, "score": None, "comment": None, "updated_at": datetime.utcnow()},
+        where=and_(
+            DraftAnswer.answer != stmt.excluded.answer,
+            DraftAnswer.interview_id == interview_id,
+            DraftAnswer.submission_id.is_(None)
+        )
+    ).returning(DraftAnswer.question_id)
+    changed = (await db.execute(stmt)).scalar_one_or_none() is not None
+    await db.commit()
+    
+    if changed and request.answer.strip():
+        evaluation_worker.enqueue_answer(draft_id, question_id)
+    
+    return {"success": True}
+
+@router.get("/{interview_id}/submissions/{submission_id}/status", response_model=SubmissionStatus)
+async def get_submission_status(
+    interview_id: str,
+    submission_id: str,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Poll the evaluation status of a submission."""
+    result = await db.execute(
+        select(Submission.recommendation).where(
+            Submission.id == submission_id,
+            Submission.interview_id == interview_id
+        )
+    )
+    recommendation = result.scalar_one_or_none()
+    
+    if recommendation is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    
+    return SubmissionStatus(
+        id=submission_id,
+        status="pending" if recommendation == "pending" else "completed"
+    )
+
+def _encode_cursor(score: float, submission_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, submission_id]).encode()).decode()
+
+def _decode_cursor(cursor: str) -> tuple[float, str]:
+    try:
+        score, submission_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), str(submission_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.get("/{interview_id}/results")
 async def get_results(
     interview_id: str,
     code: str,
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    include_details: bool = True,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all submissions for an interview (HR only with access code)."""
+    """Get submissions for an interview, best score first (HR only with access code).
+
+    Pages are keyed on (overall_score, id); pass `next_cursor` back as `cursor`
+    for the next page. `include_details=false` omits answers and scores.
+    """
     result = await db.execute(select(Interview).where(Interview.id == interview_id))
     interview = result.scalar_one_or_none()
     
@@ -212,11 +565,33 @@ async def get_results(
     if interview.hr_access_code != code:
         raise HTTPException(status_code=403, detail="Invalid access code")
     
-    # Get all submissions
-    subs_result = await db.execute(
-        select(Submission).where(Submission.interview_id == interview_id).order_by(Submission.overall_score.desc())
-    )
-    submissions = subs_result.scalars().all()
+    columns = [
+        Submission.id,
+        Submission.candidate_name,
+        Submission.candidate_email,
+        Submission.overall_score,
+        Submission.recommendation,
+        Submission.ai_summary,
+        Submission.submitted_at
+    ]
+    if include_details:
+        columns += [Submission.scores, Submission.answers]
+    
+    query = select(*columns).where(Submission.interview_id == interview_id)
+    if cursor:
+        score, last_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            Submission.overall_score < score,
+            and_(Submission.overall_score == score, Submission.id < last_id)
+        ))
+    query = query.order_by(Submission.overall_score.desc(), Submission.id.desc()).limit(limit + 1)
+    
+    rows = (await db.execute(query)).mappings().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    # Summary and score stats are maintained incrementally on write
+    stats = await interview_stats.get_stats(interview_id, db)
     
     return {
         "interview": {
@@ -227,23 +602,188 @@ async def get_results(
             "created_at": interview.created_at.isoformat()
         },
         "submissions": [
-            {
-                "id": s.id,
-                "candidate_name": s.candidate_name,
-                "candidate_email": s.candidate_email,
-                "overall_score": s.overall_score,
-                "recommendation": s.recommendation,
-                "ai_summary": s.ai_summary,
-                "scores": s.scores,
-                "answers": s.answers,
-                "submitted_at": s.submitted_at.isoformat()
-            }
-            for s in submissions
+            {**row, "submitted_at": row["submitted_at"].isoformat()}
+            for row in rows
         ],
-        "summary": {
-            "total": len(submissions),
-            "recommended": len([s for s in submissions if s.recommendation == "recommend"]),
-            "maybe": len([s for s in submissions if s.recommendation == "maybe"]),
-            "not_recommended": len([s for s in submissions if s.recommendation == "not_recommended"])
-        }
+        "next_cursor": _encode_cursor(rows[-1]["overall_score"], rows[-1]["id"]) if has_more else None,
+        **stats
     }
+
+@router.get("/{interview_id}/submissions/{submission_id}", response_model=SubmissionDetails)
+async def get_submission_details(
+    interview_id: str,
+    submission_id: str,
+    code: str,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Answers and per-question scores of one submission (HR only with access code).
+
+    For results listed with `include_details=false`.
+    """
+    result = await db.execute(select(Interview.hr_access_code).where(Interview.id == interview_id))
+    access_code = result.scalar_one_or_none()
+    
+    if access_code is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    if access_code != code:
+        raise HTTPException(status_code=403, detail="Invalid access code")
+    
+    result = await db.execute(
+        select(Submission.scores, Submission.answers).where(
+            Submission.id == submission_id,
+            Submission.interview_id == interview_id
+        )
+    )
+    row = result.one_or_none()
+    
+    if row is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    
+    return SubmissionDetails(id=submission_id, scores=row.scores or [], answers=row.answers or [])
+
+EXPORT_COLUMNS = {
+    "id": Submission.id,
+    "candidate_name": Submission.candidate_name,
+    "candidate_email": Submission.candidate_email,
+    "overall_score": Submission.overall_score,
+    "recommendation": Submission.recommendation,
+    "ai_summary": Submission.ai_summary,
+    "submitted_at": Submission.submitted_at,
+    "scores": Submission.scores,
+    "answers": Submission.answers,
+}
+DEFAULT_EXPORT_COLUMNS = ["id", "candidate_name", "candidate_email", "overall_score", "recommendation", "ai_summary", "submitted_at"]
+EXPORT_BATCH_SIZE = 250
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+# Spreadsheet apps run cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _csv_value(value):
+    # List columns (scores, answers) are embedded as JSON
+    value = json.dumps(value) if isinstance(value, (list, dict)) else _export_value(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        # Candidate input: a leading quote makes it plain text
+        return "'" + value
+    return value
+
+def _format_rows(rows, names: list[str], format: str) -> str:
+    if format == "ndjson":
+        return "".join(
+            json.dumps({name: _export_value(value) for name, value in zip(names, row)}) + "\n"
+            for row in rows
+        )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+    return buffer.getvalue()
+
+async def _export_rows(interview_id: str, names: list[str], format: str, compress: bool) -> AsyncIterator[bytes]:
+    # Pages are keyed on (submitted_at, id), which never change: keyed on the score, a
+    # submission evaluated mid-export would jump past the cursor and be skipped or
+    # repeated. Each page gets its own short-lived session, so a slow download never
+    # holds a read connection (or the WAL snapshot that comes with it)
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def encode(text: str) -> bytes:
+        data = text.encode()
+        return compressor.compress(data) if compressor else data
+
+    if format == "csv":
+        yield encode(_format_rows([names], names, "csv"))
+    query = (
+        select(*(EXPORT_COLUMNS[name] for name in names), Submission.submitted_at, Submission.id)
+        .where(Submission.interview_id == interview_id)
+        .order_by(Submission.submitted_at, Submission.id)
+        .limit(EXPORT_BATCH_SIZE)
+    )
+    page = query
+    while True:
+        async with read_session() as db:
+            rows = (await db.execute(page)).all()
+        if not rows:
+            break
+        chunk = encode(_format_rows([row[:len(names)] for row in rows], names, format))
+        results_exported_rows.labels(tool="ai-interviewer", format=format).inc(len(rows))
+        if chunk:
+            yield chunk
+        if len(rows) < EXPORT_BATCH_SIZE:
+            break
+        submitted_at, last_id = rows[-1][-2:]
+        page = query.where(or_(
+            Submission.submitted_at > submitted_at,
+            and_(Submission.submitted_at == submitted_at, Submission.id > last_id)
+        ))
+    if compressor:
+        yield compressor.flush()
+
+@router.get("/{interview_id}/export")
+async def export_results(
+    interview_id: str,
+    code: str,
+    format: Literal["csv", "ndjson"] = "csv",
+    columns: Optional[str] = Query(None, description="Comma-separated subset of: " + ", ".join(EXPORT_COLUMNS)),
+    gzip: bool = False,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Download every submission as CSV or NDJSON, oldest first (HR only with access code).
+
+    Rows are streamed as they are read. `gzip=true` returns a gzip-compressed file.
+    """
+    result = await db.execute(select(Interview.hr_access_code).where(Interview.id == interview_id))
+    access_code = result.scalar_one_or_none()
+    
+    if access_code is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    if access_code != code:
+        raise HTTPException(status_code=403, detail="Invalid access code")
+    
+    names = [c.strip() for c in columns.split(",") if c.strip()] if columns else DEFAULT_EXPORT_COLUMNS
+    unknown = [name for name in names if name not in EXPORT_COLUMNS]
+    if unknown or not names:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}" if unknown else "No columns selected")
+    
+    filename = f"interview-{interview_id}-results.{format}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else ("text/csv" if format == "csv" else "application/x-ndjson")
+    return StreamingResponse(
+        _export_rows(interview_id, names, format, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/{interview_id}/search", response_model=SearchResponse)
+async def search_submissions(
+    interview_id: str,
+    code: str,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Full-text search of answers, per-question comments and AI summaries (HR only with access code).
+
+    Words must all match; use "quotes" for a phrase, a trailing * for a prefix
+    and OR between alternatives. Hits are ranked by relevance.
+    """
+    result = await db.execute(select(Interview.hr_access_code).where(Interview.id == interview_id))
+    access_code = result.scalar_one_or_none()
+    
+    if access_code is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    if access_code != code:
+        raise HTTPException(status_code=403, detail="Invalid access code")
+    
+    expression = submission_search.fts_query(q)
+    if expression is None:
+        raise HTTPException(status_code=400, detail="Search query has no searchable words")
+    
+    total, hits = await submission_search.search(interview_id, expression, db, limit, offset)
+    return SearchResponse(total=total, hits=hits)
@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Header, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from pydantic import BaseModel
 import httpx
 import hmac
 import hashlib
 import json
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.config import get_settings
 from app.models.interview import TokenBalance, PaymentTransaction
-from app.metrics import payment_success, payment_revenue_cents, tokens_consumed
+from app.services.tokens import FREE_INTERVIEWS_LIMIT, credit_purchase
+from app.metrics import payment_success, payment_revenue_cents, payment_webhook_duplicates
 
 router = APIRouter(prefix="/payment", tags=["payment"])
 settings = get_settings()
@@ -48,7 +49,7 @@ async def create_checkout(
     
     async with httpx.AsyncClient() as client:
         response = await client.post(
-            "https://api.creem.io/v1/checkouts",
+            f"{settings.CREEM_API_URL}/v1/checkouts",
             headers={
                 "Authorization": f"Bearer {settings.CREEM_API_KEY}",
                 "Content-Type": "application/json"
@@ -84,7 +85,7 @@ async def create_checkout(
 
 @router.post("/webhook")
 async def handle_webhook(request: Request, db: AsyncSession = Depends(get_db)):
-    """Handle Creem webhook events."""
+    """Handle Creem webhook events. Replayed events are acknowledged without crediting again."""
     body = await request.body()
     signature = request.headers.get("creem-signature", "")
     
@@ -111,52 +112,52 @@ async def handle_webhook(request: Request, db: AsyncSession = Depends(get_db)):
         if not device_id or not product_key:
             return {"status": "ignored", "reason": "missing metadata"}
         
-        # Update transaction
-        tx_result = await db.execute(
-            select(PaymentTransaction).where(PaymentTransaction.checkout_id == checkout_id)
-        )
-        transaction = tx_result.scalar_one_or_none()
-        if transaction:
-            transaction.status = "completed"
-        
-        # Add tokens
-        product = PRODUCTS.get(product_key, {})
-        interviews_to_add = product.get("interviews", 0)
+        product = PRODUCTS.get(product_key)
+        if not product:
+            return {"status": "ignored", "reason": "unknown product"}
         
-        result = await db.execute(
-            select(TokenBalance).where(TokenBalance.device_id == device_id)
-        )
-        balance = result.scalar_one_or_none()
+        if not checkout_id:
+            return {"status": "ignored", "reason": "missing checkout id"}
         
-        if not balance:
-            balance = TokenBalance(device_id=device_id, balance=interviews_to_add)
-            db.add(balance)
-        else:
-            balance.balance += interviews_to_add
+        # One credit per checkout: Creem retries deliver the same checkout id
+        event_key = f"checkout:{checkout_id}"
         
+        credited = await credit_purchase(
+            device_id, event_key, product["interviews"], db,
+            product_id=product_key, amount_cents=product["price_cents"]
+        )
+        # Committed with the credit; replays also complete a transaction an earlier delivery did not
+        await db.execute(
+            update(PaymentTransaction)
+            .where(PaymentTransaction.checkout_id == checkout_id, PaymentTransaction.status != "completed")
+            .values(status="completed")
+        )
         await db.commit()
         
-        # Record metrics
+        if not credited:
+            payment_webhook_duplicates.labels(tool="ai-interviewer").inc()
+            return {"status": "duplicate"}
+        
         payment_success.labels(tool="ai-interviewer", product_sku=product_key).inc()
-        payment_revenue_cents.labels(tool="ai-interviewer").inc(product.get("price_cents", 0))
+        payment_revenue_cents.labels(tool="ai-interviewer").inc(product["price_cents"])
         
-        return {"status": "success", "interviews_added": interviews_to_add}
+        return {"status": "success", "interviews_added": product["interviews"]}
     
     return {"status": "ignored", "event": event_type}
 
 @router.get("/tokens", response_model=TokenBalanceResponse)
 async def get_token_balance(
     x_device_id: str = Header(...),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get current token balance for a device."""
     result = await db.execute(
-        select(TokenBalance).where(TokenBalance.device_id == device_id)
+        select(TokenBalance).where(TokenBalance.device_id == x_device_id)
     )
     balance = result.scalar_one_or_none()
     
     if not balance:
-        return TokenBalanceResponse(balance=0, free_trials_remaining=1)
+        return TokenBalanceResponse(balance=0, free_trials_remaining=FREE_INTERVIEWS_LIMIT)
     
-    free_remaining = max(0, 1 - balance.free_trial_used)
+    free_remaining = max(0, FREE_INTERVIEWS_LIMIT - balance.free_trial_used)
     return TokenBalanceResponse(balance=balance.balance, free_trials_remaining=free_remaining)
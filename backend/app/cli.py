@@ -0,0 +1,114 @@
+"""Maintenance commands.
+
+Usage:
+    python -m app.cli rebuild-stats [--interview-id ID]
+    python -m app.cli prune-drafts [--older-than-days N]
+    python -m app.cli backfill-ledger
+    python -m app.cli backfill-question-bank
+    python -m app.cli rebuild-search
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from app.database import engine, async_session, read_session, init_db
+from app.models.interview import Interview, DraftAnswer, PaymentTransaction, CreditLedgerEntry
+from app.api.v1.payment import PRODUCTS
+from app.services import interview_stats, question_bank, submission_search
+from app.services.ai_service import uses_fallback
+
+async def rebuild_stats(args):
+    await init_db()
+    async with async_session() as db:
+        scanned = await interview_stats.rebuild(db, args.interview_id)
+        await db.commit()
+    print(f"Rebuilt interview stats from {scanned} submissions")
+
+async def prune_drafts(args):
+    await init_db()
+    cutoff = datetime.utcnow() - timedelta(days=args.older_than_days)
+    async with async_session() as db:
+        # Submitted drafts are deleted once evaluated; these were never submitted
+        result = await db.execute(
+            delete(DraftAnswer).where(DraftAnswer.submission_id.is_(None), DraftAnswer.updated_at < cutoff)
+        )
+        await db.commit()
+    print(f"Deleted {result.rowcount} abandoned draft answers")
+
+async def backfill_ledger(args):
+    await init_db()
+    async with async_session() as db:
+        # Checkouts completed before the ledger existed; without a row, a replayed webhook would credit them again
+        result = await db.execute(
+            select(PaymentTransaction).where(PaymentTransaction.status == "completed", PaymentTransaction.checkout_id.is_not(None))
+        )
+        added = 0
+        for tx in result.scalars():
+            inserted = await db.execute(
+                insert(CreditLedgerEntry)
+                .values(
+                    event_key=f"checkout:{tx.checkout_id}",
+                    device_id=tx.device_id,
+                    delta=PRODUCTS.get(tx.product_id, {}).get("interviews", 0),
+                    product_id=tx.product_id,
+                    amount_cents=tx.amount_cents,
+                    created_at=tx.created_at
+                )
+                .on_conflict_do_nothing(index_elements=[CreditLedgerEntry.event_key])
+            )
+            added += inserted.rowcount
+        await db.commit()
+    print(f"Added {added} ledger entries for previously completed checkouts")
+
+async def backfill_question_bank(args):
+    await init_db()
+    interviews = 0
+    async with read_session() as reader, async_session() as db:
+        result = await reader.stream(
+            select(Interview.job_title, Interview.job_requirements, Interview.key_skills, Interview.questions)
+            .execution_options(yield_per=500)
+        )
+        async for row in result:
+            # Fallback questions were never generated for the spec
+            if not row.questions or uses_fallback(row.questions, row.job_title):
+                continue
+            await question_bank.add(row.job_title, row.job_requirements, row.key_skills or [], row.questions, db)
+            interviews += 1
+            if interviews % 500 == 0:
+                await db.commit()
+        await db.commit()
+    print(f"Added questions from {interviews} interviews to the question bank")
+
+async def rebuild_search(args):
+    await init_db()
+    async with engine.begin() as conn:
+        indexed = await conn.run_sync(submission_search.reindex)
+    print(f"Rebuilt the search index from {indexed} submissions")
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stats = commands.add_parser("rebuild-stats", help="Recompute per-interview aggregates from submissions")
+    stats.add_argument("--interview-id", help="Only rebuild this interview")
+    stats.set_defaults(handler=rebuild_stats)
+
+    drafts = commands.add_parser("prune-drafts", help="Delete draft answers that were never submitted")
+    drafts.add_argument("--older-than-days", type=int, default=7)
+    drafts.set_defaults(handler=prune_drafts)
+
+    ledger = commands.add_parser("backfill-ledger", help="Record completed checkouts from before the credit ledger")
+    ledger.set_defaults(handler=backfill_ledger)
+
+    bank = commands.add_parser("backfill-question-bank", help="Add the questions of existing interviews to the question bank")
+    bank.set_defaults(handler=backfill_question_bank)
+
+    search = commands.add_parser("rebuild-search", help="Rebuild the full-text index of submissions")
+    search.set_defaults(handler=rebuild_search)
+
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+if __name__ == "__main__":
+    main()
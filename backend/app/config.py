@@ -1,3 +1,4 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -5,14 +6,131 @@ class Settings(BaseSettings):
     LLM_PROXY_URL: str = "https://llm-proxy.densematrix.ai"
     LLM_PROXY_KEY: str = ""
     DATABASE_URL: str = "sqlite+aiosqlite:///./app.db"
+    CREEM_API_URL: str = "https://api.creem.io"
     CREEM_API_KEY: str = ""
     CREEM_WEBHOOK_SECRET: str = ""
     CREEM_PRODUCT_IDS: str = "{}"
     TOOL_NAME: str = "ai-interviewer"
-    
+    ADMIN_TOKEN: str = ""  # enables /api/v1/admin and request profiling when set
+
+    # Request profiling (X-Profile: 1 with a valid X-Admin-Token)
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILE_MAX_FILES: int = 100  # oldest profiles beyond this are deleted
+    PROFILE_MAX_AGE_SECONDS: int = 7 * 24 * 3600
+
+    # SQLite tuning (ignored for other databases)
+    DB_WAL: bool = True
+    DB_SYNCHRONOUS: str = "NORMAL"
+    DB_BUSY_TIMEOUT_MS: int = 5000
+    DB_MMAP_SIZE: int = 256 * 1024 * 1024
+    DB_CACHE_SIZE_KB: int = 64 * 1024
+    DB_READ_POOL_SIZE: int = 8
+    # Interview stats and search entries are written behind request transactions, batched over this window
+    DB_MAINTENANCE_DELAY_SECONDS: float = 0.2
+
+    # LLM proxy client
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    LLM_MAX_IN_FLIGHT: int = 16
+    LLM_HTTP2: bool = False  # requires the optional `h2` package
+    # Retries of timeouts, connection errors, 429 and 5xx, with full-jitter exponential backoff
+    LLM_RETRY_MAX_ATTEMPTS: int = 3
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    # Overall time for one call, covering every attempt, backoff and the wait for a slot.
+    # Interactive calls have a user waiting on them (question generation); background
+    # ones are evaluations. A timed-out attempt is not retried if another would not fit.
+    LLM_INTERACTIVE_BUDGET_SECONDS: float = 45.0
+    LLM_BACKGROUND_BUDGET_SECONDS: float = 180.0
+    # Hedging: send a second request if the first is slower than the recent p95 latency
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 2.0
+    # Circuit breaker: fail fast after consecutive failures, probe again after the reset period
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+    # Admission control: requests beyond LLM_MAX_IN_FLIGHT queue, up to this depth and wait,
+    # and are otherwise answered with 429 and Retry-After
+    LLM_MAX_QUEUE_DEPTH: int = 64
+    LLM_MAX_QUEUE_WAIT_SECONDS: float = 15.0
+    LLM_QUEUE_RETRY_AFTER_SECONDS: float = 10.0
+
+    # Per-process token-bucket rate limits (requests per minute, burst size)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEVICE_PER_MINUTE: float = 10.0  # interview creation per device
+    RATE_LIMIT_DEVICE_BURST: int = 5
+    RATE_LIMIT_INTERVIEW_PER_MINUTE: float = 60.0  # submissions per interview link
+    RATE_LIMIT_INTERVIEW_BURST: int = 30
+    RATE_LIMIT_IP_PER_MINUTE: float = 60.0  # LLM-backed requests per client IP
+    RATE_LIMIT_IP_BURST: int = 30
+    RATE_LIMIT_DRAFT_PER_MINUTE: float = 600.0  # draft saves per client IP, one per answer field blur
+    RATE_LIMIT_DRAFT_BURST: int = 120
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False  # enable behind a reverse proxy that sets X-Real-IP
+    # Peers whose X-Real-IP / X-Forwarded-For is believed (comma-separated addresses or networks)
+    RATE_LIMIT_TRUSTED_PROXIES: str = "127.0.0.1,::1,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+
+    # Bulk interview creation
+    BULK_CREATE_MAX_ITEMS: int = 50
+    BULK_CREATE_CONCURRENCY: int = 8  # below LLM_MAX_IN_FLIGHT so one batch leaves room for other users
+
+    # Background evaluation
+    EVAL_WORKERS: int = 4
+    EVAL_MAX_ATTEMPTS: int = 3
+    EVAL_RETRY_DELAY_SECONDS: float = 10.0
+    # A worker claims a submission for this long while evaluating it, so other workers skip it
+    EVAL_CLAIM_LEASE_SECONDS: float = 600.0
+    # Every interval, each worker queues submissions pending for longer than EVAL_SWEEP_AFTER_SECONDS
+    # that no live worker has claimed (e.g. their worker crashed or was restarted)
+    EVAL_SWEEP_INTERVAL_SECONDS: float = 60.0
+    EVAL_SWEEP_AFTER_SECONDS: float = 300.0
+    # Batching: evaluate several submissions of the same interview in one LLM request
+    EVAL_BATCH_ENABLED: bool = False
+    EVAL_BATCH_MAX_SIZE: int = 5
+    EVAL_BATCH_WINDOW_SECONDS: float = 5.0
+    EVAL_BATCH_MAX_PROMPT_TOKENS: int = 12000  # estimated at ~4 characters per token
+    # Output budget per candidate, and the model's output limit; a full batch must fit in it
+    EVAL_BATCH_COMPLETION_TOKENS_PER_CANDIDATE: int = 1500
+    EVAL_BATCH_MAX_COMPLETION_TOKENS: int = 8192
+
+    # Question generation cache
+    QUESTION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    QUESTION_CACHE_MEMORY_ENTRIES: int = 512
+    QUESTION_CACHE_MAX_ROWS: int = 10000
+
+    # Question bank: assemble questions from earlier generations for similar job specs
+    QUESTION_BANK_ENABLED: bool = True
+    QUESTION_BANK_MIN_SIMILARITY: float = 0.6  # TF-IDF cosine between the job spec and the spec a reused question was written for
+    QUESTION_BANK_MAX_OVERLAP: float = 0.6  # TF-IDF cosine above which two questions count as duplicates
+    QUESTION_BANK_QUESTIONS: int = 6
+    QUESTION_BANK_REFRESH_SECONDS: float = 60.0  # how often a worker picks up questions stored by others
+
+    # Candidate interview page (GET /interviews/{id})
+    INTERVIEW_VIEW_CACHE_ENTRIES: int = 4096
+    INTERVIEW_VIEW_CACHE_TTL_SECONDS: int = 600  # bounds staleness across worker processes
+    INTERVIEW_VIEW_MAX_AGE_SECONDS: int = 300  # Cache-Control max-age for browsers and CDNs
+
+    # Evaluation result cache
+    EVAL_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    EVAL_CACHE_MEMORY_ENTRIES: int = 256
+    EVAL_CACHE_MAX_ROWS: int = 20000
+
     class Config:
         env_file = ".env"
 
+    @model_validator(mode="after")
+    def _check_batch_output_budget(self):
+        if self.EVAL_BATCH_MAX_SIZE * self.EVAL_BATCH_COMPLETION_TOKENS_PER_CANDIDATE > self.EVAL_BATCH_MAX_COMPLETION_TOKENS:
+            raise ValueError(
+                f"EVAL_BATCH_MAX_SIZE={self.EVAL_BATCH_MAX_SIZE} needs "
+                f"{self.EVAL_BATCH_MAX_SIZE * self.EVAL_BATCH_COMPLETION_TOKENS_PER_CANDIDATE} completion tokens, more than "
+                f"EVAL_BATCH_MAX_COMPLETION_TOKENS={self.EVAL_BATCH_MAX_COMPLETION_TOKENS}; lower it to at most "
+                f"{self.EVAL_BATCH_MAX_COMPLETION_TOKENS // self.EVAL_BATCH_COMPLETION_TOKENS_PER_CANDIDATE}"
+            )
+        return self
+
 @lru_cache()
 def get_settings():
     return Settings()
@@ -1,17 +1,96 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import time
+from sqlalchemy import event, inspect
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config import get_settings
+from app import timing
 
 settings = get_settings()
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+def _is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite") and ":memory:" not in url and not url.rstrip("/").endswith(":")
+
+def _sqlite_pragmas(read_only: bool) -> list[str]:
+    pragmas = [
+        f"PRAGMA busy_timeout={settings.DB_BUSY_TIMEOUT_MS}",
+        f"PRAGMA synchronous={settings.DB_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={settings.DB_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{settings.DB_CACHE_SIZE_KB}",  # negative = KiB
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    elif settings.DB_WAL:
+        pragmas.insert(0, "PRAGMA journal_mode=WAL")
+    return pragmas
+
+def _track_query_time(engine: AsyncEngine):
+    # Accumulates statement time into the current request's Server-Timing "db" entry
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        timing.record("db", time.perf_counter() - conn.info["query_start"].pop())
+
+def create_engine_for(url: str, read_only: bool = False, pool_size: int = 1) -> AsyncEngine:
+    """Create an engine with the configured SQLite pragmas applied to every new connection."""
+    if not _is_sqlite_file(url):
+        engine = create_async_engine(url, echo=False)
+        _track_query_time(engine)
+        return engine
+
+    # aiosqlite defaults to NullPool; keep connections open so the pragmas are paid once
+    engine = create_async_engine(url, echo=False, poolclass=AsyncAdaptedQueuePool, pool_size=pool_size, max_overflow=0)
+    pragmas = _sqlite_pragmas(read_only)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    _track_query_time(engine)
+    return engine
+
+# SQLite allows one writer at a time: all writes go through a single connection,
+# while reads use a separate pool of query-only connections (concurrent under WAL).
+engine = create_engine_for(settings.DATABASE_URL)
+if _is_sqlite_file(settings.DATABASE_URL):
+    read_engine = create_engine_for(settings.DATABASE_URL, read_only=True, pool_size=settings.DB_READ_POOL_SIZE)
+else:
+    read_engine = engine
+
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+read_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
 async def get_db():
     async with async_session() as session:
         yield session
 
+async def get_read_db():
+    """Session for endpoints that only read."""
+    async with read_session() as session:
+        yield session
+
+def _create_all(conn):
+    Base.metadata.create_all(conn)
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
 async def init_db():
+    # Imported here: the services import models, which import this module
+    from app.services import submission_search, interview_stats
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        stats_exists = await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("interview_stats"))
+        await conn.run_sync(_create_all)
+        await conn.run_sync(submission_search.install)
+        if not stats_exists:
+            # Upgrading from before the stats table: count the submissions already there
+            async with AsyncSession(bind=conn) as db:
+                await interview_stats.rebuild(db)
@@ -1,23 +1,58 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from typing import Optional
+import math
 import time
 from app.database import init_db
-from app.api.v1 import interviews, payment
-from app.metrics import router as metrics_router, http_requests, http_request_duration, crawler_visits
+from app.api.v1 import interviews, payment, admin
+from app import profiling, timing
+from app.services import llm_client, evaluation_worker, question_bank, maintenance
+from app.services.rate_limit import RateLimitedError
+from app.metrics import router as metrics_router, http_requests, http_request_duration, crawler_visits, cleanup_dead_workers
 
 BOT_PATTERNS = ["Googlebot", "bingbot", "Baiduspider", "YandexBot", "DuckDuckBot", "Slurp", "facebot"]
+# Lowercased once at import; a case-insensitive regex alternation benchmarked slower
+_BOT_MATCHERS = tuple((bot.lower(), bot) for bot in BOT_PATTERNS)
+
+# Label for requests that matched no route (404 probes, scanners), so arbitrary
+# paths cannot create new time series
+UNMATCHED_ENDPOINT = "unmatched"
+
+def match_bot(user_agent: str) -> Optional[str]:
+    """Return the BOT_PATTERNS entry found in the user agent, if any."""
+    user_agent = user_agent.lower()
+    for pattern, bot in _BOT_MATCHERS:
+        if pattern in user_agent:
+            return bot
+    return None
+
+def endpoint_label(request: Request) -> str:
+    """Route template of the matched endpoint, e.g. /api/v1/interviews/{interview_id}."""
+    route = request.scope.get("route")
+    return getattr(route, "path", UNMATCHED_ENDPOINT)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    cleanup_dead_workers()
     await init_db()
+    question_bank.start()
+    await llm_client.init_client()
+    await evaluation_worker.start()
     yield
+    await evaluation_worker.stop()
+    await maintenance.stop()
+    await llm_client.close_client()
+
+timing.time_serialization()
 
 app = FastAPI(
     title="AI Interviewer",
     description="AI-powered text interview screening agent",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=timing.TimedJSONResponse
 )
 
 # CORS
@@ -29,23 +64,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Load shedding: rate limits and a full LLM request queue are both answered with 429
+@app.exception_handler(RateLimitedError)
+async def rate_limited_handler(request: Request, exc: RateLimitedError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests. Please try again shortly."},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
+@app.exception_handler(llm_client.LLMOverloadedError)
+async def llm_overloaded_handler(request: Request, exc: llm_client.LLMOverloadedError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "The AI service is busy. Please try again shortly."},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
+@app.exception_handler(llm_client.LLMUnavailableError)
+async def llm_unavailable_handler(request: Request, exc: llm_client.LLMUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "The AI service is temporarily unavailable. Please try again shortly."},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
 # Request tracking middleware
 @app.middleware("http")
 async def track_requests(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter()
+    timings = timing.start_request()
+    
+    # Opt-in sampling profile of this request (admins only)
+    profiler = None
+    if request.headers.get("x-profile") == "1" and admin.is_admin(request.headers.get("x-admin-token", "")):
+        profiler = profiling.try_start()
     
     # Track crawlers
-    ua = request.headers.get("user-agent", "")
-    for bot in BOT_PATTERNS:
-        if bot.lower() in ua.lower():
-            crawler_visits.labels(tool="ai-interviewer", bot=bot).inc()
-            break
+    bot = match_bot(request.headers.get("user-agent", ""))
+    if bot:
+        crawler_visits.labels(tool="ai-interviewer", bot=bot).inc()
     
-    response = await call_next(request)
+    try:
+        response = await call_next(request)
+    finally:
+        if profiler:
+            profile_id = profiling.finish(profiler)
     
     # Record metrics
-    duration = time.time() - start_time
-    endpoint = request.url.path
+    duration = time.perf_counter() - start_time
+    response.headers["Server-Timing"] = timing.server_timing_header(timings, duration)
+    if profiler:
+        response.headers["X-Profile-Id"] = profile_id
+    endpoint = endpoint_label(request)
     method = request.method
     status = response.status_code
     
@@ -72,4 +143,5 @@ async def health():
 # Include routers
 app.include_router(interviews.router, prefix="/api/v1")
 app.include_router(payment.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
 app.include_router(metrics_router)
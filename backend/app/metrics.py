@@ -1,10 +1,16 @@
+import glob
 import os
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, generate_latest, multiprocess, CONTENT_TYPE_LATEST
 from fastapi import APIRouter
 from fastapi.responses import Response
 
 TOOL_NAME = os.getenv("TOOL_NAME", "ai-interviewer")
 
+# Multi-worker deployments set PROMETHEUS_MULTIPROC_DIR (read by prometheus_client
+# at import time): every worker writes its samples to mmap files in that directory
+# and /metrics aggregates them. Gauges declare how worker values are combined.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
 # HTTP metrics
 http_requests = Counter(
     "http_requests_total",
@@ -18,6 +24,12 @@ http_request_duration = Histogram(
     ["tool", "endpoint", "method"]
 )
 
+rate_limited_requests = Counter(
+    "rate_limited_requests_total",
+    "Requests rejected with 429 by a token-bucket rate limit",
+    ["tool", "scope"]
+)
+
 # Business metrics
 interviews_created = Counter(
     "interviews_created_total",
@@ -31,6 +43,100 @@ submissions_total = Counter(
     ["tool"]
 )
 
+evaluation_queue_depth = Gauge(
+    "evaluation_queue_depth",
+    "Submissions waiting for AI evaluation",
+    ["tool"],
+    multiprocess_mode="livesum"
+)
+
+evaluation_jobs = Counter(
+    "evaluation_jobs_total",
+    "Background evaluation jobs by outcome",
+    ["tool", "outcome"]
+)
+
+evaluation_batch_size = Histogram(
+    "evaluation_batch_size",
+    "Submissions evaluated per batched LLM request",
+    ["tool"],
+    buckets=(1, 2, 4, 8, 16, 32)
+)
+
+evaluation_answer_scores = Counter(
+    "evaluation_answer_scores_total",
+    "Per-question scores used in final evaluations, by whether they were scored from a draft or at submit time",
+    ["tool", "source"]
+)
+
+question_cache_hits = Counter(
+    "question_cache_hits_total",
+    "Question generation cache hits",
+    ["tool", "tier"]
+)
+
+question_cache_misses = Counter(
+    "question_cache_misses_total",
+    "Question generation cache misses",
+    ["tool"]
+)
+
+question_cache_evictions = Counter(
+    "question_cache_evictions_total",
+    "Question generation cache evictions",
+    ["tool", "tier", "reason"]
+)
+
+question_bank_lookups = Counter(
+    "question_bank_lookups_total",
+    "Question bank lookups by result (hit, below_threshold, skills_missing, too_small)",
+    ["tool", "result"]
+)
+
+question_bank_size = Gauge(
+    "question_bank_size",
+    "Questions in the in-memory question bank index",
+    ["tool"],
+    multiprocess_mode="max"
+)
+
+question_bank_search_duration = Histogram(
+    "question_bank_search_duration_seconds",
+    "Time to score the question bank against a job spec",
+    ["tool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+
+results_exported_rows = Counter(
+    "results_exported_rows_total",
+    "Submissions streamed by the results export, by format",
+    ["tool", "format"]
+)
+
+interview_view_requests = Counter(
+    "interview_view_cache_requests_total",
+    "Candidate interview page lookups by result (hit, miss, not_modified)",
+    ["tool", "result"]
+)
+
+evaluation_cache_hits = Counter(
+    "evaluation_cache_hits_total",
+    "Evaluation result cache hits",
+    ["tool", "tier"]
+)
+
+evaluation_cache_misses = Counter(
+    "evaluation_cache_misses_total",
+    "Evaluation result cache misses",
+    ["tool"]
+)
+
+evaluation_cache_evictions = Counter(
+    "evaluation_cache_evictions_total",
+    "Evaluation result cache evictions",
+    ["tool", "tier", "reason"]
+)
+
 # Payment metrics
 payment_success = Counter(
     "payment_success_total",
@@ -44,12 +150,24 @@ payment_revenue_cents = Counter(
     ["tool"]
 )
 
+payment_webhook_duplicates = Counter(
+    "payment_webhook_duplicates_total",
+    "Payment webhooks ignored because the event was already credited",
+    ["tool"]
+)
+
 tokens_consumed = Counter(
     "tokens_consumed_total",
     "Tokens consumed",
     ["tool"]
 )
 
+tokens_refunded = Counter(
+    "tokens_refunded_total",
+    "Reserved tokens and free trials returned after a failed interview creation",
+    ["tool"]
+)
+
 free_trial_used = Counter(
     "free_trial_used_total",
     "Free trials used",
@@ -69,8 +187,149 @@ crawler_visits = Counter(
     ["tool", "bot"]
 )
 
+# LLM proxy client metrics
+llm_in_flight = Gauge(
+    "llm_client_in_flight",
+    "LLM proxy requests currently in flight",
+    ["tool", "operation"],
+    multiprocess_mode="livesum"
+)
+
+llm_in_flight_limit = Gauge(
+    "llm_client_in_flight_limit",
+    "Maximum concurrent LLM proxy requests",
+    ["tool"],
+    multiprocess_mode="livesum"
+)
+
+llm_queue_wait = Histogram(
+    "llm_client_queue_wait_seconds",
+    "Time spent waiting for an LLM proxy request slot",
+    ["tool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+llm_pool_saturated = Counter(
+    "llm_client_saturated_total",
+    "LLM proxy requests that found every request slot busy",
+    ["tool"]
+)
+
+# LLM call instrumentation
+llm_retries = Counter(
+    "llm_client_retries_total",
+    "LLM proxy requests retried, by reason",
+    ["tool", "operation", "reason"]
+)
+
+llm_hedged_requests = Counter(
+    "llm_client_hedged_requests_total",
+    "Hedged second LLM proxy requests, by which request answered first",
+    ["tool", "operation", "outcome"]
+)
+
+llm_circuit_state = Gauge(
+    "llm_client_circuit_state",
+    "LLM proxy circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["tool"],
+    multiprocess_mode="livemax"
+)
+
+llm_circuit_rejections = Counter(
+    "llm_client_circuit_rejections_total",
+    "LLM proxy requests rejected without being sent because the circuit was open",
+    ["tool", "operation"]
+)
+
+llm_queue_depth = Gauge(
+    "llm_client_queue_depth",
+    "LLM proxy requests waiting for a request slot",
+    ["tool"],
+    multiprocess_mode="livesum"
+)
+
+llm_admission_rejections = Counter(
+    "llm_client_admission_rejections_total",
+    "LLM proxy requests turned away because the request queue was full or too slow",
+    ["tool", "operation", "reason"]
+)
+
+llm_request_duration = Histogram(
+    "llm_request_duration_seconds",
+    "Upstream LLM proxy latency",
+    ["tool", "operation", "model"],
+    buckets=(0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+)
+
+llm_time_to_first_token = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time until the first streamed content delta from the LLM proxy",
+    ["tool", "operation", "model"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+)
+
+llm_request_errors = Counter(
+    "llm_request_errors_total",
+    "LLM proxy requests that failed (transport error or HTTP error status)",
+    ["tool", "operation", "error"]
+)
+
+llm_tokens = Counter(
+    "llm_tokens_total",
+    "Tokens reported in the proxy usage field",
+    ["tool", "operation", "model", "kind"]
+)
+
+llm_parse_failures = Counter(
+    "llm_parse_failures_total",
+    "LLM responses that were not valid JSON",
+    ["tool", "operation"]
+)
+
+llm_fallbacks = Counter(
+    "llm_fallbacks_total",
+    "LLM responses replaced by the hard-coded fallback result",
+    ["tool", "operation"]
+)
+
+llm_requests_coalesced = Counter(
+    "llm_requests_coalesced_total",
+    "LLM requests served by an identical in-flight request",
+    ["tool"]
+)
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def cleanup_dead_workers():
+    """Drop live-gauge files of worker processes that no longer exist.
+
+    Counter and histogram files are kept so totals do not go backwards when a
+    worker is replaced. Under gunicorn this also runs from the child_exit hook.
+    """
+    if not MULTIPROC_DIR:
+        return
+    pids = set()
+    for path in glob.glob(os.path.join(MULTIPROC_DIR, "*.db")):
+        suffix = os.path.basename(path)[:-3].rsplit("_", 1)[-1]
+        if suffix.isdigit():
+            pids.add(int(suffix))
+    for pid in pids:
+        if not _pid_alive(pid):
+            multiprocess.mark_process_dead(pid, MULTIPROC_DIR)
+
 router = APIRouter()
 
 @router.get("/metrics")
 async def metrics():
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, JSON, Float, ForeignKey, Integer
+from sqlalchemy import Column, String, Text, DateTime, JSON, Float, ForeignKey, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -38,6 +38,56 @@ class Submission(Base):
     submitted_at = Column(DateTime, default=datetime.utcnow)
     
     interview = relationship("Interview", back_populates="submissions")
+    
+    __table_args__ = (
+        Index("ix_submissions_interview_score", "interview_id", "overall_score"),
+        Index("ix_submissions_interview_email", "interview_id", "candidate_email"),
+        Index("ix_submissions_interview_submitted", "interview_id", "submitted_at"),
+    )
+
+class EvaluationClaim(Base):
+    """Which worker process is evaluating a pending submission, until when."""
+    __tablename__ = "evaluation_claims"
+    
+    submission_id = Column(String(36), ForeignKey("submissions.id", ondelete="CASCADE"), primary_key=True)
+    worker = Column(String(64), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+class DraftAnswer(Base):
+    """An answer saved while the candidate is still answering, scored in the background."""
+    __tablename__ = "draft_answers"
+    
+    draft_id = Column(String(36), primary_key=True)  # generated by the candidate's browser
+    question_id = Column(Integer, primary_key=True)
+    interview_id = Column(String(36), ForeignKey("interviews.id"), nullable=False)
+    answer = Column(Text, nullable=False)
+    score = Column(Integer, nullable=True)  # null until scored
+    comment = Column(Text, nullable=True)
+    submission_id = Column(String(36), nullable=True, index=True)  # set on final submit
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+class InterviewStats(Base):
+    """Running per-interview aggregates, maintained alongside Submission writes."""
+    __tablename__ = "interview_stats"
+    
+    interview_id = Column(String(36), ForeignKey("interviews.id"), primary_key=True)
+    submission_count = Column(Integer, default=0)
+    pending_count = Column(Integer, default=0)
+    recommended_count = Column(Integer, default=0)
+    maybe_count = Column(Integer, default=0)
+    not_recommended_count = Column(Integer, default=0)
+    scored_count = Column(Integer, default=0)
+    score_sum = Column(Float, default=0.0)
+    score_sum_sq = Column(Float, default=0.0)
+
+class QuestionScoreBucket(Base):
+    """Per-question score histogram: how many answers to a question got each score."""
+    __tablename__ = "question_score_buckets"
+    
+    interview_id = Column(String(36), ForeignKey("interviews.id"), primary_key=True)
+    question_id = Column(Integer, primary_key=True)
+    score = Column(Integer, primary_key=True)  # 1-5
+    count = Column(Integer, default=0)
 
 class TokenBalance(Base):
     __tablename__ = "token_balances"
@@ -60,3 +110,47 @@ class PaymentTransaction(Base):
     currency = Column(String(3), default="USD")
     status = Column(String(20), default="pending")  # pending, completed, failed
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class CreditLedgerEntry(Base):
+    """Append-only record of interview credits granted; one row per payment event."""
+    __tablename__ = "credit_ledger"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_key = Column(String(255), unique=True, nullable=False)  # e.g. "checkout:<creem checkout id>"; replays collide here
+    device_id = Column(String(64), nullable=False, index=True)
+    delta = Column(Integer, nullable=False)
+    product_id = Column(String(255))
+    amount_cents = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class QuestionCacheEntry(Base):
+    __tablename__ = "question_cache"
+    
+    key = Column(String(64), primary_key=True)  # sha256 of the normalized job spec
+    questions = Column(JSON, nullable=False)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class QuestionBankEntry(Base):
+    """One generated question, with the job spec it was generated for, for reuse on similar specs."""
+    __tablename__ = "question_bank"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)  # workers load new rows incrementally by id
+    text_hash = Column(String(64), unique=True, nullable=False)  # sha256 of the normalized question text
+    text = Column(Text, nullable=False)
+    expected_focus = Column(Text, default="")
+    job_title = Column(String(255), nullable=False)
+    job_requirements = Column(Text, nullable=False)
+    key_skills = Column(JSON, default=list)  # normalized
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class EvaluationCacheEntry(Base):
+    __tablename__ = "evaluation_cache"
+    
+    key = Column(String(64), primary_key=True)  # sha256 of prompt version, model, interview and normalized answers
+    prompt_version = Column(Integer, nullable=False)
+    evaluation = Column(JSON, nullable=False)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,100 @@
+"""Opt-in sampling profiler for single requests.
+
+A background thread samples the event loop thread's Python stack at a fixed
+interval and counts identical stacks. The result is written in collapsed-stack
+format ("frame;frame;frame count" per line), which flamegraph.pl and
+speedscope can open. Sampling covers the whole event loop thread, so other
+requests running at the same time show up in the profile too. Only one
+profile runs at a time. Stored profiles are pruned to PROFILE_MAX_FILES and
+PROFILE_MAX_AGE_SECONDS whenever a new one is written.
+"""
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+_PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_active = threading.Lock()
+
+class SamplingProfiler:
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.samples: Counter[str] = Counter()
+        self._target_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self._target_thread)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+def try_start() -> Optional[SamplingProfiler]:
+    """Start a profiler for the current request, or return None if one is already running."""
+    if not _active.acquire(blocking=False):
+        return None
+    profiler = SamplingProfiler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    profiler.start()
+    return profiler
+
+def finish(profiler: SamplingProfiler) -> str:
+    """Stop the profiler, store its output and return the profile id."""
+    try:
+        profiler.stop()
+    finally:
+        _active.release()
+    profile_id = uuid.uuid4().hex
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(settings.PROFILE_DIR, f"{profile_id}.txt"), "w") as f:
+        f.write(profiler.collapsed())
+    _prune()
+    return profile_id
+
+def _prune():
+    """Delete stored profiles beyond the newest PROFILE_MAX_FILES or older than PROFILE_MAX_AGE_SECONDS."""
+    profiles = []
+    with os.scandir(settings.PROFILE_DIR) as entries:
+        for entry in entries:
+            name, ext = os.path.splitext(entry.name)
+            if ext == ".txt" and _PROFILE_ID_RE.match(name) and entry.is_file():
+                try:
+                    profiles.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass
+    profiles.sort(reverse=True)
+    cutoff = time.time() - settings.PROFILE_MAX_AGE_SECONDS
+    for index, (mtime, path) in enumerate(profiles):
+        if index >= settings.PROFILE_MAX_FILES or mtime < cutoff:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+def profile_path(profile_id: str) -> Optional[str]:
+    if not _PROFILE_ID_RE.match(profile_id):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, f"{profile_id}.txt")
+    return path if os.path.exists(path) else None
@@ -1,14 +1,79 @@
-import httpx
+import asyncio
+import hashlib
 import json
+import time
+from typing import AsyncIterator, Awaitable, Callable
 from app.config import get_settings
+from app.services.llm_client import post_chat_completion, stream_chat_completion
+from app import timing
+from app.metrics import llm_requests_coalesced, llm_parse_failures, llm_fallbacks
 
 settings = get_settings()
 
-async def generate_questions(job_title: str, job_requirements: str, key_skills: list[str]) -> list[dict]:
-    """Generate interview questions based on job requirements."""
+MODEL = "claude-sonnet-4-20250514"
+# Bump whenever the evaluation prompts or scoring rubric change; invalidates cached evaluations
+EVALUATION_PROMPT_VERSION = 1
+
+FALLBACK_COMMENT = "Evaluation pending"
+FALLBACK_SUMMARY = "Unable to fully evaluate responses. Please review manually."
+
+# Identical prompts currently awaiting the proxy, keyed by payload hash
+_in_flight: dict[str, asyncio.Task] = {}
+
+async def _single_flight(key: str, call: Callable[[], Awaitable]):
+    """Run `call` once per key at a time; concurrent callers with the same key share its result."""
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(call())
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    else:
+        llm_requests_coalesced.labels(tool="ai-interviewer").inc()
+    # Shielded so one cancelled waiter does not cancel the call for the others
+    return await asyncio.shield(task)
+
+def _extract_json(content: str):
+    """Parse a JSON payload, tolerating markdown code fences around it."""
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0]
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0]
+    return json.loads(content.strip())
+
+async def _chat(prompt: str, max_tokens: int, temperature: float, operation: str, interactive: bool = False) -> str:
+    payload = {
+        "model": MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": max_tokens,
+        "temperature": temperature
+    }
+    key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    with timing.timed("llm"):
+        data = await _single_flight(key, lambda: post_chat_completion(payload, operation, interactive))
+    return data["choices"][0]["message"]["content"]
+
+QUESTION_COUNT = 6
+
+def fallback_questions(job_title: str) -> list[dict]:
+    """Generic questions used when the LLM response cannot be parsed."""
+    return [
+        {"id": 1, "text": f"Tell me about your experience relevant to {job_title}.", "expected_focus": "Relevant experience"},
+        {"id": 2, "text": "What interests you about this position?", "expected_focus": "Motivation and fit"},
+        {"id": 3, "text": "Describe a challenging project you've worked on.", "expected_focus": "Problem-solving skills"},
+        {"id": 4, "text": "How do you handle tight deadlines?", "expected_focus": "Time management"},
+        {"id": 5, "text": "What are your key strengths?", "expected_focus": "Self-awareness"},
+        {"id": 6, "text": "Do you have any questions about the role?", "expected_focus": "Engagement and curiosity"}
+    ]
+
+def uses_fallback(questions: list[dict], job_title: str) -> bool:
+    """Whether any of the questions is a generic fallback one; such sets are never cached or banked."""
+    texts = {q["text"] for q in fallback_questions(job_title)}
+    return any(q.get("text") in texts for q in questions)
+
+def _questions_prompt(job_title: str, job_requirements: str, key_skills: list[str]) -> str:
     skills_text = ", ".join(key_skills) if key_skills else "general skills"
     
-    prompt = f"""You are an expert HR interviewer. Generate 6 screening interview questions for the following position:
+    return f"""You are an expert HR interviewer. Generate {QUESTION_COUNT} screening interview questions for the following position:
 
 Job Title: {job_title}
 Requirements: {job_requirements}
@@ -20,8 +85,8 @@ Generate questions that:
 3. Include one technical/practical scenario
 4. Are answerable in text format (no video/audio required)
 
-Return a JSON array with exactly 6 questions. Each question should have:
-- "id": number (1-6)
+Return a JSON array with exactly {QUESTION_COUNT} questions. Each question should have:
+- "id": number (1-{QUESTION_COUNT})
 - "text": the question text
 - "expected_focus": what a good answer should address
 
@@ -32,42 +97,106 @@ Example format:
 
 Return ONLY valid JSON, no markdown or explanation."""
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(
-            f"{settings.LLM_PROXY_URL}/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {settings.LLM_PROXY_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "claude-sonnet-4-20250514",
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 2000,
-                "temperature": 0.7
-            }
-        )
-        response.raise_for_status()
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-        
-        # Parse JSON from response
-        try:
-            # Handle potential markdown code blocks
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-            return json.loads(content.strip())
-        except json.JSONDecodeError:
-            # Fallback questions
-            return [
-                {"id": 1, "text": f"Tell me about your experience relevant to {job_title}.", "expected_focus": "Relevant experience"},
-                {"id": 2, "text": "What interests you about this position?", "expected_focus": "Motivation and fit"},
-                {"id": 3, "text": "Describe a challenging project you've worked on.", "expected_focus": "Problem-solving skills"},
-                {"id": 4, "text": "How do you handle tight deadlines?", "expected_focus": "Time management"},
-                {"id": 5, "text": "What are your key strengths?", "expected_focus": "Self-awareness"},
-                {"id": 6, "text": "Do you have any questions about the role?", "expected_focus": "Engagement and curiosity"}
-            ]
+async def generate_questions(job_title: str, job_requirements: str, key_skills: list[str]) -> list[dict]:
+    """Generate interview questions based on job requirements.
+
+    Raises LLMUnavailableError while the circuit breaker is open, so the caller
+    can refund the interview credit instead of charging it for the generic set.
+    """
+    prompt = _questions_prompt(job_title, job_requirements, key_skills)
+    content = await _chat(prompt, max_tokens=2000, temperature=0.7, operation="generate_questions", interactive=True)
+
+    try:
+        questions = _extract_json(content)
+    except json.JSONDecodeError:
+        llm_parse_failures.labels(tool="ai-interviewer", operation="generate_questions").inc()
+        questions = None
+
+    if not isinstance(questions, list) or not all(isinstance(q, dict) and "text" in q for q in questions):
+        llm_fallbacks.labels(tool="ai-interviewer", operation="generate_questions").inc()
+        return fallback_questions(job_title)
+    return questions
+
+class _ArrayItemParser:
+    """Incrementally pulls complete objects out of a JSON array as its text streams in.
+
+    Text before the opening bracket (e.g. a markdown fence) is ignored. `closed`
+    tells whether the array's closing bracket was seen, i.e. the output was not cut off.
+    """
+
+    def __init__(self):
+        self.closed = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._current: list[str] = []
+
+    def feed(self, text: str) -> list[dict]:
+        items = []
+        for ch in text:
+            if self._depth >= 2:
+                self._current.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"' and self._depth >= 1:
+                self._in_string = True
+            elif ch in "[{":
+                if self._depth == 1 and ch == "{":
+                    self._current = [ch]
+                self._depth += 1
+            elif ch in "]}" and self._depth:
+                self._depth -= 1
+                if self._depth == 0 and ch == "]":
+                    self.closed = True
+                elif self._depth == 1 and ch == "}":
+                    try:
+                        item = json.loads("".join(self._current))
+                    except json.JSONDecodeError:
+                        item = None
+                    if isinstance(item, dict) and "text" in item:
+                        items.append(item)
+                    self._current = []
+        return items
+
+async def stream_questions(job_title: str, job_requirements: str, key_skills: list[str]) -> AsyncIterator[dict]:
+    """Like generate_questions, but yields each question as soon as the model finishes writing it.
+
+    If the output is cut off (e.g. at max_tokens) or has fewer than
+    QUESTION_COUNT questions, fallback questions are added, so uses_fallback()
+    keeps the set out of the question cache and bank. LLMUnavailableError is
+    raised, before any question, while the circuit breaker is open.
+    """
+    payload = {
+        "model": MODEL,
+        "messages": [{"role": "user", "content": _questions_prompt(job_title, job_requirements, key_skills)}],
+        "max_tokens": 2000,
+        "temperature": 0.7
+    }
+    parser = _ArrayItemParser()
+    produced = 0
+    start = time.perf_counter()
+    try:
+        async for delta in stream_chat_completion(payload, "generate_questions", interactive=True):
+            for question in parser.feed(delta):
+                produced += 1
+                yield question
+    finally:
+        timing.record("llm", time.perf_counter() - start)
+
+    if produced and parser.closed and produced >= QUESTION_COUNT:
+        return
+    llm_parse_failures.labels(tool="ai-interviewer", operation="generate_questions").inc()
+    llm_fallbacks.labels(tool="ai-interviewer", operation="generate_questions").inc()
+    # At least one fallback question, so a cut-off set is never cached even if it has enough questions
+    padding = fallback_questions(job_title)
+    padding = padding[:QUESTION_COUNT - produced] if produced < QUESTION_COUNT else padding[-1:]
+    for number, question in enumerate(padding, start=produced + 1):
+        yield {**question, "id": number}
 
 async def evaluate_submission(interview: dict, answers: list[dict]) -> dict:
     """Evaluate candidate's answers."""
@@ -100,35 +229,181 @@ Return a JSON object with:
 
 Return ONLY valid JSON."""
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(
-            f"{settings.LLM_PROXY_URL}/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {settings.LLM_PROXY_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "claude-sonnet-4-20250514",
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 1500,
-                "temperature": 0.3
-            }
-        )
-        response.raise_for_status()
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-        
-        try:
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-            return json.loads(content.strip())
-        except json.JSONDecodeError:
-            # Fallback evaluation
-            return {
-                "scores": [{"question_id": a["question_id"], "score": 3, "comment": "Evaluation pending"} for a in answers],
-                "overall_score": 3.0,
-                "recommendation": "maybe",
-                "summary": "Unable to fully evaluate responses. Please review manually."
-            }
+    content = await _chat(prompt, max_tokens=1500, temperature=0.3, operation="evaluate_submission")
+
+    try:
+        evaluation = _extract_json(content)
+    except json.JSONDecodeError:
+        llm_parse_failures.labels(tool="ai-interviewer", operation="evaluate_submission").inc()
+        evaluation = None
+
+    if isinstance(evaluation, dict):
+        return evaluation
+
+    # Fallback evaluation
+    llm_fallbacks.labels(tool="ai-interviewer", operation="evaluate_submission").inc()
+    return {
+        "scores": [{"question_id": a["question_id"], "score": 3, "comment": FALLBACK_COMMENT} for a in answers],
+        "overall_score": 3.0,
+        "recommendation": "maybe",
+        "summary": FALLBACK_SUMMARY
+    }
+
+def is_fallback_evaluation(evaluation: dict) -> bool:
+    """True if any part of the evaluation is a placeholder rather than model output."""
+    return evaluation.get("summary") == FALLBACK_SUMMARY or any(
+        s.get("comment") == FALLBACK_COMMENT for s in evaluation.get("scores", [])
+    )
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt size estimate (~4 characters per token), for budgeting batches."""
+    return len(text) // 4 + 1
+
+async def evaluate_batch(interview: dict, candidates: list[list[dict]]) -> list[dict | None]:
+    """Evaluate several candidates' answers to the same interview in one request.
+
+    The job description and questions are sent once for the whole batch. Returns
+    one evaluation per candidate, in order, or None where the model output for
+    that candidate is missing or malformed.
+    """
+    questions_text = "\n".join([f"Q{q['id']}: {q['text']} (Focus: {q['expected_focus']})" for q in interview["questions"]])
+    candidates_text = "\n\n".join(
+        f"Candidate {i}:\n" + "\n".join([f"A{a['question_id']}: {a['answer']}" for a in answers])
+        for i, answers in enumerate(candidates, start=1)
+    )
+
+    prompt = f"""You are an expert HR interviewer evaluating several candidates' screening interview responses independently.
+
+Position: {interview["job_title"]}
+Requirements: {interview["job_requirements"]}
+
+Questions and Expected Focus:
+{questions_text}
+
+{candidates_text}
+
+Evaluate each candidate on their own merits. Score each answer on a scale of 1-5:
+- 5: Excellent - comprehensive, specific examples, clear communication
+- 4: Good - solid response with relevant details
+- 3: Average - acceptable but lacks depth
+- 2: Below Average - vague or partially relevant
+- 1: Poor - irrelevant or very weak response
+
+Return a JSON array with one object per candidate, each with:
+- "candidate": the candidate number
+- "scores": array of {{"question_id": number, "score": 1-5, "comment": "brief feedback"}}
+- "overall_score": weighted average (number 1-5)
+- "recommendation": "recommend" (>=4.0), "maybe" (3.0-3.9), or "not_recommended" (<3.0)
+- "summary": 2-3 sentence overall assessment
+
+Return ONLY valid JSON."""
+
+    # Settings guarantee a full batch fits in EVAL_BATCH_MAX_COMPLETION_TOKENS
+    max_tokens = settings.EVAL_BATCH_COMPLETION_TOKENS_PER_CANDIDATE * len(candidates)
+    content = await _chat(prompt, max_tokens=max_tokens, temperature=0.3, operation="evaluate_batch")
+
+    try:
+        parsed = _extract_json(content)
+    except json.JSONDecodeError:
+        llm_parse_failures.labels(tool="ai-interviewer", operation="evaluate_batch").inc()
+        parsed = None
+
+    results: list[dict | None] = [None] * len(candidates)
+    if isinstance(parsed, list):
+        for item in parsed:
+            if not isinstance(item, dict) or not isinstance(item.get("scores"), list):
+                continue
+            index = item.pop("candidate", None)
+            if isinstance(index, int) and 1 <= index <= len(candidates):
+                results[index - 1] = item
+    return results
+
+async def score_answer(interview: dict, question: dict, answer: str) -> dict:
+    """Score a single answer against its question's expected focus.
+
+    Returns {"question_id", "score", "comment"}, with a neutral score if the model output is unusable.
+    """
+    prompt = f"""You are an expert HR interviewer scoring one answer from a candidate's screening interview.
+
+Position: {interview["job_title"]}
+Requirements: {interview["job_requirements"]}
+
+Question: {question["text"]}
+Expected Focus: {question["expected_focus"]}
+
+Candidate's Answer:
+{answer}
+
+Score the answer on a scale of 1-5:
+- 5: Excellent - comprehensive, specific examples, clear communication
+- 4: Good - solid response with relevant details
+- 3: Average - acceptable but lacks depth
+- 2: Below Average - vague or partially relevant
+- 1: Poor - irrelevant or very weak response
+
+Return a JSON object: {{"score": 1-5, "comment": "brief feedback"}}
+
+Return ONLY valid JSON."""
+
+    content = await _chat(prompt, max_tokens=200, temperature=0.3, operation="score_answer")
+
+    try:
+        result = _extract_json(content)
+    except json.JSONDecodeError:
+        llm_parse_failures.labels(tool="ai-interviewer", operation="score_answer").inc()
+        result = None
+
+    if isinstance(result, dict) and isinstance(result.get("score"), (int, float)):
+        return {
+            "question_id": question["id"],
+            "score": min(5, max(1, round(result["score"]))),
+            "comment": str(result.get("comment", ""))
+        }
+
+    llm_fallbacks.labels(tool="ai-interviewer", operation="score_answer").inc()
+    return {"question_id": question["id"], "score": 3, "comment": FALLBACK_COMMENT}
+
+def recommendation_for(overall_score: float) -> str:
+    if overall_score >= 4.0:
+        return "recommend"
+    if overall_score >= 3.0:
+        return "maybe"
+    return "not_recommended"
+
+async def summarize_evaluation(interview: dict, scores: list[dict]) -> dict:
+    """Combine already-computed per-question scores into a final evaluation.
+
+    The overall score and recommendation are computed locally; only the short
+    summary is written by the model, from the scores and comments rather than
+    the full answers.
+    """
+    overall_score = round(sum(s["score"] for s in scores) / len(scores), 1) if scores else 0.0
+    recommendation = recommendation_for(overall_score)
+
+    questions = {q["id"]: q["text"] for q in interview["questions"]}
+    scores_text = "\n".join(
+        f"Q{s['question_id']}: {questions.get(s['question_id'], '')} -> {s['score']}/5 ({s['comment']})"
+        for s in scores
+    )
+    prompt = f"""You are an expert HR interviewer summarizing a candidate's screening interview.
+
+Position: {interview["job_title"]}
+
+Per-question scores and feedback:
+{scores_text}
+
+Overall score: {overall_score}/5 ({recommendation})
+
+Write a 2-3 sentence overall assessment of the candidate. Return only the assessment text."""
+
+    summary = (await _chat(prompt, max_tokens=300, temperature=0.3, operation="summarize_evaluation")).strip()
+    if not summary:
+        llm_fallbacks.labels(tool="ai-interviewer", operation="summarize_evaluation").inc()
+        summary = FALLBACK_SUMMARY
+
+    return {
+        "scores": scores,
+        "overall_score": overall_score,
+        "recommendation": recommendation,
+        "summary": summary
+    }
@@ -0,0 +1,150 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Hashable, Optional
+from prometheus_client import Counter
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+class LRUCache:
+    """In-process LRU cache with an optional per-entry TTL.
+
+    `on_evict(reason)` is called with "size" or "expired" whenever an entry is dropped.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        on_evict: Optional[Callable[[str], None]] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at and expires_at < time.monotonic():
+            del self._entries[key]
+            self._evicted("expired")
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0.0
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evicted("size")
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def _evicted(self, reason: str):
+        if self.on_evict:
+            self.on_evict(reason)
+
+_MISSING = object()
+
+class TwoTierCache:
+    """Per-process LRUCache in front of a database table shared by every worker.
+
+    `model` has a string primary key `key`, a JSON column named `value_column`,
+    and `hits`, `created_at` and `last_used_at` columns. Rows older than
+    `ttl_seconds` are dropped when read, and each store trims the table to its
+    `max_rows` most recently used rows. `hits` and `evictions` are labelled with
+    the tier ("memory" or "db"); evictions also with the reason.
+    """
+
+    def __init__(
+        self,
+        model,
+        value_column: str,
+        memory_entries: int,
+        ttl_seconds: float,
+        max_rows: int,
+        hits: Counter,
+        misses: Counter,
+        evictions: Counter
+    ):
+        self.model = model
+        self.value_column = value_column
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.memory = LRUCache(
+            memory_entries,
+            ttl_seconds=ttl_seconds,
+            on_evict=lambda reason: evictions.labels(tool="ai-interviewer", tier="memory", reason=reason).inc()
+        )
+
+    async def get(self, key: str, db: AsyncSession) -> Any:
+        """The cached value, or None. A database hit is recorded by the caller's commit."""
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits.labels(tool="ai-interviewer", tier="memory").inc()
+            return value
+
+        entry = await db.get(self.model, key)
+        if entry is None:
+            self.misses.labels(tool="ai-interviewer").inc()
+            return None
+
+        now = datetime.utcnow()
+        if entry.created_at < now - timedelta(seconds=self.ttl_seconds):
+            await db.delete(entry)
+            self.evictions.labels(tool="ai-interviewer", tier="db", reason="expired").inc()
+            self.misses.labels(tool="ai-interviewer").inc()
+            return None
+
+        entry.hits += 1
+        entry.last_used_at = now
+        value = getattr(entry, self.value_column)
+        self.memory.set(key, value)
+        self.hits.labels(tool="ai-interviewer", tier="db").inc()
+        return value
+
+    async def store(self, key: str, value: Any, db: AsyncSession, **columns):
+        """Upsert the value (and any other `columns` of the row). Persisted by the caller's commit."""
+        now = datetime.utcnow()
+        # Upsert: concurrent misses for the same key all store it
+        stmt = insert(self.model).values(
+            key=key, **{self.value_column: value}, **columns, hits=0, created_at=now, last_used_at=now
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[self.model.key],
+            set_={self.value_column: stmt.excluded[self.value_column], **columns, "created_at": now, "last_used_at": now}
+        ))
+        self.memory.set(key, value)
+
+        # Keep the table bounded: drop the least recently used rows past the limit
+        result = await db.execute(
+            delete(self.model).where(
+                self.model.key.in_(
+                    select(self.model.key)
+                    .order_by(self.model.last_used_at.desc())
+                    .offset(self.max_rows)
+                )
+            )
+        )
+        if result.rowcount:
+            self.evictions.labels(tool="ai-interviewer", tier="db", reason="size").inc(result.rowcount)
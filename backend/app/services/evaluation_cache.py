@@ -0,0 +1,62 @@
+import hashlib
+import json
+from typing import Optional
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models.interview import EvaluationCacheEntry
+from app.services.ai_service import MODEL, EVALUATION_PROMPT_VERSION, is_fallback_evaluation
+from app.services.cache import TwoTierCache
+from app.metrics import evaluation_cache_hits, evaluation_cache_misses, evaluation_cache_evictions
+
+settings = get_settings()
+
+_cache = TwoTierCache(
+    EvaluationCacheEntry, "evaluation",
+    memory_entries=settings.EVAL_CACHE_MEMORY_ENTRIES,
+    ttl_seconds=settings.EVAL_CACHE_TTL_SECONDS,
+    max_rows=settings.EVAL_CACHE_MAX_ROWS,
+    hits=evaluation_cache_hits,
+    misses=evaluation_cache_misses,
+    evictions=evaluation_cache_evictions
+)
+_stale_versions_purged = False
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+def cache_key(interview: dict, answers: list[dict]) -> str:
+    """Hash of everything the evaluation depends on: prompt version, model, job, questions and answers.
+
+    Answers are compared after collapsing whitespace and ordering by question.
+    """
+    normalized = {
+        "prompt_version": EVALUATION_PROMPT_VERSION,
+        "model": MODEL,
+        "title": _normalize(interview["job_title"]),
+        "requirements": _normalize(interview["job_requirements"]),
+        "questions": [[q["id"], q["text"], q["expected_focus"]] for q in interview["questions"]],
+        "answers": sorted(
+            [a.get("question_id"), _normalize(str(a.get("answer", "")))] for a in answers
+        )
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+async def get_cached(key: str, db: AsyncSession) -> Optional[dict]:
+    return await _cache.get(key, db)
+
+async def store(key: str, evaluation: dict, db: AsyncSession):
+    """Cache an evaluation unless it is (partly) a fallback. Persisted by the caller's commit."""
+    if is_fallback_evaluation(evaluation):
+        return
+    await _cache.store(key, evaluation, db, prompt_version=EVALUATION_PROMPT_VERSION)
+
+    global _stale_versions_purged
+    if not _stale_versions_purged:
+        # Entries from older prompt versions can no longer be hit; drop them once per process
+        result = await db.execute(
+            delete(EvaluationCacheEntry).where(EvaluationCacheEntry.prompt_version != EVALUATION_PROMPT_VERSION)
+        )
+        if result.rowcount:
+            evaluation_cache_evictions.labels(tool="ai-interviewer", tier="db", reason="version").inc(result.rowcount)
+        _stale_versions_purged = True
@@ -0,0 +1,396 @@
+"""Background evaluation of submissions in each worker process.
+
+Jobs live in an in-process queue. Before evaluating a submission, a worker
+claims it in the evaluation_claims table for EVAL_CLAIM_LEASE_SECONDS; a
+submission claimed by another live worker is skipped. Submissions whose
+worker died with them still queued stay pending and unclaimed (or their claim
+expires), and every worker periodically sweeps those back into its queue, so
+they are evaluated once whichever worker picks them up first.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, update, delete, or_, literal, DateTime
+from sqlalchemy.dialects.sqlite import insert
+from app.config import get_settings
+from app.database import async_session, read_session
+from app.models.interview import Interview, Submission, DraftAnswer, EvaluationClaim
+from app.services.ai_service import (
+    evaluate_submission, evaluate_batch, estimate_tokens, score_answer, summarize_evaluation
+)
+from app.services import maintenance, evaluation_cache
+from app.services.llm_client import LLMUnavailableError, LLMOverloadedError
+from app.metrics import evaluation_queue_depth, evaluation_jobs, evaluation_answer_scores, evaluation_batch_size
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_queue: Optional[asyncio.Queue] = None
+_workers: list[asyncio.Task] = []
+_sweeper: Optional[asyncio.Task] = None
+_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+# Submissions this process has queued and not finished; sweeps skip them
+_accepted: set[str] = set()
+
+@dataclass
+class _PendingBatch:
+    submission_ids: list[str] = field(default_factory=list)
+    prompt_tokens: int = 0
+    timer: Optional[asyncio.TimerHandle] = None
+
+# Submissions waiting for their interview's batch to fill up or its window to close
+_batches: dict[str, _PendingBatch] = {}
+
+async def start():
+    """Start the evaluation workers, re-queue submissions left pending by a previous run and start the sweeper."""
+    global _queue, _workers, _sweeper
+    _queue = asyncio.Queue()
+    _workers = [asyncio.create_task(_worker()) for _ in range(settings.EVAL_WORKERS)]
+    await recover_pending()
+    _sweeper = asyncio.create_task(_sweep())
+
+async def stop():
+    """Stop the workers. Unfinished jobs stay pending in the database and are recovered on the next start."""
+    global _queue, _workers, _sweeper
+    tasks = _workers + ([_sweeper] if _sweeper else [])
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for batch in _batches.values():
+        if batch.timer:
+            batch.timer.cancel()
+    _batches.clear()
+    _accepted.clear()
+    _workers = []
+    _sweeper = None
+    _queue = None
+
+def enqueue(submission_id: str, attempt: int = 1):
+    """Queue a submission for evaluation."""
+    if _queue is not None:
+        _accepted.add(submission_id)
+    _put("submission", (submission_id,), attempt)
+
+def enqueue_answer(draft_id: str, question_id: int, attempt: int = 1):
+    """Queue a draft answer for per-question scoring."""
+    _put("answer", (draft_id, question_id), attempt)
+
+def _put(kind: str, args: tuple, attempt: int):
+    if _queue is None:
+        # Not running (e.g. a script). Pending submissions are picked up by recover_pending
+        # on next start; unscored draft answers are scored when the submission is evaluated.
+        return
+    _queue.put_nowait((kind, args, attempt))
+    evaluation_queue_depth.labels(tool="ai-interviewer").set(_queue.qsize())
+
+async def recover_pending(min_age_seconds: float = 0.0):
+    """Enqueue pending submissions older than `min_age_seconds` that no live worker has claimed."""
+    now = datetime.utcnow()
+    async with read_session() as db:
+        result = await db.execute(
+            select(Submission.id)
+            .outerjoin(EvaluationClaim, EvaluationClaim.submission_id == Submission.id)
+            .where(
+                Submission.recommendation == "pending",
+                Submission.submitted_at <= now - timedelta(seconds=min_age_seconds),
+                or_(EvaluationClaim.expires_at.is_(None), EvaluationClaim.expires_at < now)
+            )
+            .order_by(Submission.submitted_at)
+        )
+        pending = [submission_id for submission_id in result.scalars() if submission_id not in _accepted]
+
+    for submission_id in pending:
+        enqueue(submission_id)
+    if pending:
+        logger.info("Recovered %d pending evaluations", len(pending))
+
+async def _sweep():
+    while True:
+        await asyncio.sleep(settings.EVAL_SWEEP_INTERVAL_SECONDS)
+        try:
+            await recover_pending(settings.EVAL_SWEEP_AFTER_SECONDS)
+        except Exception:
+            logger.exception("Sweep for pending evaluations failed")
+
+async def _claim(submission_ids: list[str], db) -> set[str]:
+    """Claim the still-pending submissions for this process, or renew its claim; returns the ids it now holds.
+
+    A claim held by another worker is only taken over once it has expired.
+    Persisted by the caller's commit, which must come before the LLM call.
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=settings.EVAL_CLAIM_LEASE_SECONDS)
+    stmt = insert(EvaluationClaim).from_select(
+        ["submission_id", "worker", "expires_at"],
+        select(Submission.id, literal(_WORKER_ID), literal(expires_at, type_=DateTime))
+        .where(Submission.id.in_(submission_ids), Submission.recommendation == "pending")
+    )
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[EvaluationClaim.submission_id],
+            set_={"worker": stmt.excluded.worker, "expires_at": stmt.excluded.expires_at},
+            where=or_(EvaluationClaim.worker == _WORKER_ID, EvaluationClaim.expires_at < now)
+        ).returning(EvaluationClaim.submission_id)
+    )
+    return set(result.scalars())
+
+async def _worker():
+    while True:
+        kind, args, attempt = await _queue.get()
+        evaluation_queue_depth.labels(tool="ai-interviewer").set(_queue.qsize())
+        try:
+            await _JOBS[kind](*args)
+            evaluation_jobs.labels(tool="ai-interviewer", outcome="completed").inc()
+        except asyncio.CancelledError:
+            raise
+        except (LLMUnavailableError, LLMOverloadedError) as e:
+            # Proxy is down or its queue is full: try again later, without using up an attempt
+            evaluation_jobs.labels(tool="ai-interviewer", outcome="deferred").inc()
+            asyncio.get_running_loop().call_later(e.retry_after, _put, kind, args, attempt)
+        except Exception:
+            logger.exception("Evaluation job %s %s failed (attempt %d)", kind, args, attempt)
+            if attempt < settings.EVAL_MAX_ATTEMPTS:
+                evaluation_jobs.labels(tool="ai-interviewer", outcome="retried").inc()
+                asyncio.get_running_loop().call_later(
+                    settings.EVAL_RETRY_DELAY_SECONDS * attempt,
+                    _put, kind, args, attempt + 1
+                )
+            else:
+                # Left pending; another sweep picks it up once the claim expires
+                evaluation_jobs.labels(tool="ai-interviewer", outcome="failed").inc()
+                if kind == "submission":
+                    _accepted.discard(args[0])
+                elif kind == "batch":
+                    _accepted.difference_update(args[1])
+        finally:
+            _queue.task_done()
+
+async def _evaluate(submission_id: str, batch: bool = True):
+    # Load what the prompt needs from the read pool; the writer is only taken to claim the submission
+    async with read_session() as db:
+        result = await db.execute(
+            select(Submission, Interview)
+            .join(Interview, Submission.interview_id == Interview.id)
+            .where(Submission.id == submission_id, Submission.recommendation == "pending")
+        )
+        row = result.one_or_none()
+        if row:
+            result = await db.execute(select(DraftAnswer).where(DraftAnswer.submission_id == submission_id))
+            drafts = {draft.question_id: draft for draft in result.scalars()}
+    if not row:
+        # Deleted or evaluated meanwhile
+        _accepted.discard(submission_id)
+        return
+    submission, interview = row
+    interview_id = interview.id
+    interview_dict = {
+        "job_title": interview.job_title,
+        "job_requirements": interview.job_requirements,
+        "questions": interview.questions
+    }
+    answers = submission.answers
+    cache_key = evaluation_cache.cache_key(interview_dict, answers)
+
+    # Release the writer before the LLM round-trip
+    async with async_session() as db:
+        if not await _claim([submission_id], db):
+            # Evaluated meanwhile, or another worker is on it
+            _accepted.discard(submission_id)
+            return
+        evaluation = await evaluation_cache.get_cached(cache_key, db)
+        await db.commit()
+
+    # Identical answers to the same questions were evaluated before: reuse that result
+    if evaluation is None:
+        if drafts:
+            evaluation = await _evaluate_from_drafts(interview_dict, answers, drafts)
+        elif batch and settings.EVAL_BATCH_ENABLED:
+            _add_to_batch(interview_id, submission_id, estimate_tokens(json.dumps(answers)), interview_dict)
+            return
+        else:
+            evaluation = await evaluate_submission(interview_dict, answers)
+
+    async with async_session() as db:
+        stored = await _store_evaluation(submission_id, evaluation, db)
+        await evaluation_cache.store(cache_key, evaluation, db)
+        if drafts:
+            await db.execute(delete(DraftAnswer).where(DraftAnswer.submission_id == submission_id))
+        await db.commit()
+    if stored:
+        _stats_changed(interview_id, evaluation)
+    _accepted.discard(submission_id)
+
+async def _store_evaluation(submission_id: str, evaluation: dict, db) -> bool:
+    """Fill in a pending submission's evaluation; False if it was no longer pending."""
+    result = await db.execute(
+        update(Submission)
+        .where(Submission.id == submission_id, Submission.recommendation == "pending")
+        .values(
+            scores=evaluation.get("scores", []),
+            overall_score=evaluation.get("overall_score", 0),
+            recommendation=evaluation.get("recommendation", "pending"),
+            ai_summary=evaluation.get("summary", "")
+        )
+    )
+    await db.execute(delete(EvaluationClaim).where(EvaluationClaim.submission_id == submission_id))
+    return bool(result.rowcount)
+
+def _stats_changed(interview_id: str, evaluation: dict):
+    # Queued once the evaluation is committed, so the stats never count one that was rolled back
+    maintenance.stats_changed(
+        interview_id,
+        old=("pending", 0.0, []),
+        new=(
+            evaluation.get("recommendation", "pending"),
+            evaluation.get("overall_score", 0),
+            evaluation.get("scores", [])
+        )
+    )
+
+def _add_to_batch(interview_id: str, submission_id: str, answer_tokens: int, interview: dict):
+    """Hold a submission until its interview's batch is full or the batch window closes."""
+    batch = _batches.get(interview_id)
+    if batch is not None and batch.prompt_tokens + answer_tokens > settings.EVAL_BATCH_MAX_PROMPT_TOKENS:
+        _flush_batch(interview_id)
+        batch = None
+    if batch is None:
+        # The job description and questions are sent once per batch
+        batch = _PendingBatch(prompt_tokens=estimate_tokens(json.dumps(interview)))
+        batch.timer = asyncio.get_running_loop().call_later(
+            settings.EVAL_BATCH_WINDOW_SECONDS, _flush_batch, interview_id
+        )
+        _batches[interview_id] = batch
+    batch.submission_ids.append(submission_id)
+    batch.prompt_tokens += answer_tokens
+    if len(batch.submission_ids) >= settings.EVAL_BATCH_MAX_SIZE:
+        _flush_batch(interview_id)
+
+def _flush_batch(interview_id: str):
+    batch = _batches.pop(interview_id, None)
+    if batch is None:
+        return
+    if batch.timer:
+        batch.timer.cancel()
+    if len(batch.submission_ids) == 1:
+        _put("submission", (batch.submission_ids[0], False), 1)
+    else:
+        _put("batch", (interview_id, tuple(batch.submission_ids)), 1)
+
+async def _evaluate_batch(interview_id: str, submission_ids: tuple[str, ...]):
+    async with read_session() as db:
+        interview = await db.get(Interview, interview_id)
+        if interview is None:
+            return
+        interview_dict = {
+            "job_title": interview.job_title,
+            "job_requirements": interview.job_requirements,
+            "questions": interview.questions
+        }
+        result = await db.execute(
+            select(Submission.id, Submission.answers)
+            .where(Submission.id.in_(submission_ids), Submission.recommendation == "pending")
+            .order_by(Submission.submitted_at)
+        )
+        pending = result.all()
+    claimed = set()
+    if pending:
+        async with async_session() as db:
+            # Renews the claims taken when the submissions joined the batch
+            claimed = await _claim([submission_id for submission_id, _ in pending], db)
+            await db.commit()
+    # Evaluated meanwhile, or another worker is on them
+    _accepted.difference_update(set(submission_ids) - claimed)
+    pending = [(submission_id, answers) for submission_id, answers in pending if submission_id in claimed]
+    if not pending:
+        return
+
+    evaluation_batch_size.labels(tool="ai-interviewer").observe(len(pending))
+    evaluations = await evaluate_batch(interview_dict, [answers for _, answers in pending])
+
+    stored = set()
+    async with async_session() as db:
+        for (submission_id, answers), evaluation in zip(pending, evaluations):
+            if evaluation is not None:
+                if await _store_evaluation(submission_id, evaluation, db):
+                    stored.add(submission_id)
+                await evaluation_cache.store(evaluation_cache.cache_key(interview_dict, answers), evaluation, db)
+        await db.commit()
+    for (submission_id, _), evaluation in zip(pending, evaluations):
+        if evaluation is not None:
+            if submission_id in stored:
+                _stats_changed(interview_id, evaluation)
+            _accepted.discard(submission_id)
+
+    # Candidates the model skipped or garbled are evaluated on their own
+    for (submission_id, _), evaluation in zip(pending, evaluations):
+        if evaluation is None:
+            _put("submission", (submission_id, False), 1)
+
+async def _evaluate_from_drafts(interview: dict, answers: list[dict], drafts: dict[int, DraftAnswer]) -> dict:
+    """Reuse the draft scores for answers that were not changed before submitting, score the rest, then synthesize."""
+    questions = {q["id"]: q for q in interview["questions"]}
+    scores: dict[int, dict] = {}
+    missing = []
+    for a in answers:
+        question = questions.get(a.get("question_id"))
+        if question is None:
+            continue
+        draft = drafts.get(question["id"])
+        if draft is not None and draft.score is not None and draft.answer == a.get("answer", ""):
+            scores[question["id"]] = {"question_id": question["id"], "score": draft.score, "comment": draft.comment or ""}
+        else:
+            missing.append((question, a.get("answer", "")))
+
+    evaluation_answer_scores.labels(tool="ai-interviewer", source="draft").inc(len(scores))
+    evaluation_answer_scores.labels(tool="ai-interviewer", source="submit").inc(len(missing))
+    for score in await asyncio.gather(*(score_answer(interview, q, answer) for q, answer in missing)):
+        scores[score["question_id"]] = score
+
+    return await summarize_evaluation(interview, [scores[q] for q in questions if q in scores])
+
+async def _score_draft(draft_id: str, question_id: int):
+    async with read_session() as db:
+        result = await db.execute(
+            select(DraftAnswer, Interview)
+            .join(Interview, DraftAnswer.interview_id == Interview.id)
+            .where(DraftAnswer.draft_id == draft_id, DraftAnswer.question_id == question_id)
+        )
+        row = result.one_or_none()
+        if not row:
+            return
+        draft, interview = row
+        # Already submitted: the submission's evaluation scores it instead
+        if draft.score is not None or draft.submission_id is not None:
+            return
+        question = next((q for q in interview.questions if q["id"] == question_id), None)
+        if question is None:
+            return
+        interview_dict = {"job_title": interview.job_title, "job_requirements": interview.job_requirements}
+        answer = draft.answer
+
+    score = await score_answer(interview_dict, question, answer)
+
+    async with async_session() as db:
+        # Only store the score if the candidate has not edited the answer meanwhile
+        await db.execute(
+            update(DraftAnswer)
+            .where(
+                DraftAnswer.draft_id == draft_id,
+                DraftAnswer.question_id == question_id,
+                DraftAnswer.answer == answer
+            )
+            .values(score=score["score"], comment=score["comment"])
+        )
+        await db.commit()
+
+_JOBS = {
+    "submission": _evaluate,
+    "batch": _evaluate_batch,
+    "answer": _score_draft,
+}
@@ -0,0 +1,159 @@
+import math
+from collections import Counter
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.interview import InterviewStats, QuestionScoreBucket, Submission
+
+RECOMMENDATION_COLUMNS = {
+    "pending": "pending_count",
+    "recommend": "recommended_count",
+    "maybe": "maybe_count",
+    "not_recommended": "not_recommended_count"
+}
+
+COUNTER_COLUMNS = [
+    "submission_count", "pending_count", "recommended_count", "maybe_count",
+    "not_recommended_count", "scored_count", "score_sum", "score_sum_sq"
+]
+
+def _bucket(score) -> Optional[int]:
+    try:
+        return min(5, max(1, int(round(float(score)))))
+    except (TypeError, ValueError):
+        return None
+
+def _contribution(recommendation: str, overall_score: Optional[float], scores: Optional[list]) -> tuple[Counter, Counter]:
+    """What one submission adds to the counters and to the per-question histogram."""
+    counters = Counter(submission_count=1)
+    column = RECOMMENDATION_COLUMNS.get(recommendation)
+    if column:
+        counters[column] += 1
+    buckets = Counter()
+    if recommendation != "pending":
+        score = float(overall_score or 0)
+        counters.update(scored_count=1, score_sum=score, score_sum_sq=score * score)
+        for item in scores or []:
+            bucket = _bucket(item.get("score"))
+            if bucket is not None and item.get("question_id") is not None:
+                buckets[(int(item["question_id"]), bucket)] += 1
+    return counters, buckets
+
+async def _write(deltas: dict[str, tuple[Counter, Counter]], db: AsyncSession):
+    # One statement for all interviews' counters and one for all their histogram buckets
+    if not deltas:
+        return
+    stmt = insert(InterviewStats)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[InterviewStats.interview_id],
+            set_={column: getattr(InterviewStats, column) + stmt.excluded[column] for column in COUNTER_COLUMNS}
+        ),
+        [
+            {"interview_id": interview_id, **{column: counters.get(column, 0) for column in COUNTER_COLUMNS}}
+            for interview_id, (counters, _) in deltas.items()
+        ]
+    )
+
+    rows = [
+        {"interview_id": interview_id, "question_id": question_id, "score": score, "count": delta}
+        for interview_id, (_, buckets) in deltas.items()
+        for (question_id, score), delta in buckets.items() if delta
+    ]
+    if rows:
+        stmt = insert(QuestionScoreBucket)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[QuestionScoreBucket.interview_id, QuestionScoreBucket.question_id, QuestionScoreBucket.score],
+                set_={"count": QuestionScoreBucket.count + stmt.excluded.count}
+            ),
+            rows
+        )
+
+def delta(
+    old: Optional[tuple[str, Optional[float], Optional[list]]] = None,
+    new: Optional[tuple[str, Optional[float], Optional[list]]] = None
+) -> tuple[Counter, Counter]:
+    """Counter and histogram changes for moving a submission from `old` (recommendation, overall_score, scores) to `new`.
+
+    Pass only `new` for an inserted submission. Deltas add up, so several can be merged and written at once.
+    """
+    counters, buckets = Counter(), Counter()
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        state_counters, state_buckets = _contribution(*state)
+        for key, value in state_counters.items():
+            counters[key] += sign * value
+        for key, value in state_buckets.items():
+            buckets[key] += sign * value
+    return counters, buckets
+
+async def apply_deltas(deltas: dict[str, tuple[Counter, Counter]], db: AsyncSession):
+    """Add changes from delta() to the aggregates of each interview id in `deltas`, in the caller's transaction."""
+    await _write(deltas, db)
+
+async def apply_change(
+    interview_id: str,
+    db: AsyncSession,
+    old: Optional[tuple[str, Optional[float], Optional[list]]] = None,
+    new: Optional[tuple[str, Optional[float], Optional[list]]] = None
+):
+    """Move the aggregates from a submission's `old` state to `new` (see delta()), in the caller's transaction."""
+    await _write({interview_id: delta(old, new)}, db)
+
+async def get_stats(interview_id: str, db: AsyncSession) -> dict:
+    """Summary and score statistics for the results dashboard."""
+    stats = await db.get(InterviewStats, interview_id)
+    buckets = await db.execute(
+        select(QuestionScoreBucket.question_id, QuestionScoreBucket.score, QuestionScoreBucket.count)
+        .where(QuestionScoreBucket.interview_id == interview_id, QuestionScoreBucket.count > 0)
+    )
+    histograms: dict[int, dict[int, int]] = {}
+    for question_id, score, count in buckets:
+        histograms.setdefault(question_id, {s: 0 for s in range(1, 6)})[score] = count
+
+    scored = stats.scored_count if stats else 0
+    mean = stats.score_sum / scored if scored else None
+    variance = max(0.0, stats.score_sum_sq / scored - mean * mean) if scored else None
+    return {
+        "summary": {
+            "total": stats.submission_count if stats else 0,
+            "recommended": stats.recommended_count if stats else 0,
+            "maybe": stats.maybe_count if stats else 0,
+            "not_recommended": stats.not_recommended_count if stats else 0,
+            "pending": stats.pending_count if stats else 0
+        },
+        "stats": {
+            "scored": scored,
+            "mean_score": round(mean, 2) if mean is not None else None,
+            "stddev_score": round(math.sqrt(variance), 2) if variance is not None else None,
+            "question_histograms": histograms
+        }
+    }
+
+async def rebuild(db: AsyncSession, interview_id: Optional[str] = None) -> int:
+    """Recompute aggregates from the submissions table. Returns the number of submissions scanned."""
+    stats_delete = delete(InterviewStats)
+    buckets_delete = delete(QuestionScoreBucket)
+    query = select(Submission.interview_id, Submission.recommendation, Submission.overall_score, Submission.scores)
+    if interview_id:
+        stats_delete = stats_delete.where(InterviewStats.interview_id == interview_id)
+        buckets_delete = buckets_delete.where(QuestionScoreBucket.interview_id == interview_id)
+        query = query.where(Submission.interview_id == interview_id)
+    await db.execute(stats_delete)
+    await db.execute(buckets_delete)
+
+    totals: dict[str, tuple[Counter, Counter]] = {}
+    scanned = 0
+    rows = await db.stream(query.execution_options(yield_per=500))
+    async for sub_interview_id, recommendation, overall_score, scores in rows:
+        counters, buckets = totals.setdefault(sub_interview_id, (Counter(), Counter()))
+        sub_counters, sub_buckets = _contribution(recommendation, overall_score, scores)
+        counters.update(sub_counters)
+        buckets.update(sub_buckets)
+        scanned += 1
+
+    await _write(totals, db)
+    return scanned
@@ -0,0 +1,58 @@
+"""Pre-serialized candidate view of interviews, for GET /interviews/{id}.
+
+Questions do not change after an interview is created, so the JSON body and its
+ETag are built once per process and kept in an LRU. Updates and deletes through
+the ORM invalidate the local entry; the TTL bounds how long other worker
+processes can serve an outdated copy.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models.interview import Interview
+from app.services.cache import LRUCache
+
+settings = get_settings()
+
+@dataclass(frozen=True)
+class InterviewView:
+    body: bytes
+    etag: str
+
+_views = LRUCache(settings.INTERVIEW_VIEW_CACHE_ENTRIES, ttl_seconds=settings.INTERVIEW_VIEW_CACHE_TTL_SECONDS)
+
+def _build(interview_id: str, job_title: str, questions: list[dict]) -> InterviewView:
+    # Questions without expected_focus (that's for HR only)
+    body = json.dumps({
+        "id": interview_id,
+        "job_title": job_title,
+        "questions": [{"id": q["id"], "text": q["text"]} for q in questions]
+    }, separators=(",", ":")).encode()
+    return InterviewView(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+async def get_view(interview_id: str, db: AsyncSession) -> tuple[Optional[InterviewView], bool]:
+    """Return (view, cache_hit); view is None if the interview does not exist."""
+    view = _views.get(interview_id)
+    if view is not None:
+        return view, True
+
+    result = await db.execute(
+        select(Interview.job_title, Interview.questions).where(Interview.id == interview_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None, False
+    view = _build(interview_id, row.job_title, row.questions)
+    _views.set(interview_id, view)
+    return view, False
+
+def invalidate(interview_id: str):
+    _views.pop(interview_id)
+
+@event.listens_for(Interview, "after_update")
+@event.listens_for(Interview, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    invalidate(target.id)
@@ -0,0 +1,371 @@
+import asyncio
+import importlib.util
+import json
+import random
+import time
+from collections import defaultdict, deque
+from contextlib import aclosing, asynccontextmanager
+from typing import AsyncIterator, Optional
+import httpx
+from app.config import get_settings
+from app.metrics import (
+    llm_in_flight, llm_in_flight_limit, llm_queue_wait, llm_pool_saturated,
+    llm_request_duration, llm_request_errors, llm_tokens, llm_time_to_first_token,
+    llm_retries, llm_hedged_requests, llm_circuit_state, llm_circuit_rejections,
+    llm_queue_depth, llm_admission_rejections
+)
+
+settings = get_settings()
+
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_waiting = 0
+
+# Recent successful latencies per operation, for the hedging delay
+_latencies: dict[str, deque] = defaultdict(lambda: deque(maxlen=200))
+_HEDGE_MIN_SAMPLES = 20
+
+class LLMUnavailableError(Exception):
+    """Raised without contacting the proxy while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM proxy unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+class LLMOverloadedError(Exception):
+    """Raised when the request queue in front of the proxy is full or too slow to drain."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM request queue is full, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+class _CircuitBreaker:
+    """Opens after consecutive failures; after `reset_seconds` lets one probe request through."""
+
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at: Optional[float] = None
+
+    def check(self, operation: str):
+        now = time.monotonic()
+        if self.state == self.CLOSED:
+            return
+        if self.state == self.OPEN and now - self.opened_at >= self.reset_seconds:
+            self._set(self.HALF_OPEN)
+        # One probe at a time; a probe that never reported back (e.g. cancelled) expires
+        if self.state == self.HALF_OPEN and (
+            self.probe_started_at is None or now - self.probe_started_at >= self.reset_seconds
+        ):
+            self.probe_started_at = now
+            return
+        llm_circuit_rejections.labels(tool="ai-interviewer", operation=operation).inc()
+        raise LLMUnavailableError(max(1.0, self.opened_at + self.reset_seconds - now))
+
+    def record_success(self):
+        self.failures = 0
+        self.probe_started_at = None
+        if self.state != self.CLOSED:
+            self._set(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_started_at = None
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set(self.OPEN)
+
+    def _set(self, state: int):
+        self.state = state
+        llm_circuit_state.labels(tool="ai-interviewer").set(state)
+
+_breaker = _CircuitBreaker(settings.LLM_BREAKER_FAILURE_THRESHOLD, settings.LLM_BREAKER_RESET_SECONDS)
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = settings.LLM_HTTP2 and importlib.util.find_spec("h2") is not None
+    return httpx.AsyncClient(
+        base_url=settings.LLM_PROXY_URL,
+        headers={
+            "Authorization": f"Bearer {settings.LLM_PROXY_KEY}",
+            "Content-Type": "application/json"
+        },
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        http2=http2
+    )
+
+async def init_client():
+    """Create the shared LLM proxy client. Called from the app lifespan."""
+    global _client, _semaphore
+    if _client is None:
+        _client = _build_client()
+        _semaphore = asyncio.Semaphore(settings.LLM_MAX_IN_FLIGHT)
+        llm_in_flight_limit.labels(tool="ai-interviewer").set(settings.LLM_MAX_IN_FLIGHT)
+        llm_circuit_state.labels(tool="ai-interviewer").set(_breaker.state)
+
+async def close_client():
+    """Close the shared client and drop its pooled connections."""
+    global _client, _semaphore
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _semaphore = None
+
+def get_client() -> httpx.AsyncClient:
+    if _client is None:
+        raise RuntimeError("LLM client is not initialized")
+    return _client
+
+def check_admission(operation: str):
+    """Raise LLMOverloadedError if LLM_MAX_QUEUE_DEPTH requests are already waiting for a slot."""
+    if _semaphore is not None and _semaphore.locked() and _waiting >= settings.LLM_MAX_QUEUE_DEPTH:
+        llm_admission_rejections.labels(tool="ai-interviewer", operation=operation, reason="queue_full").inc()
+        raise LLMOverloadedError(settings.LLM_QUEUE_RETRY_AFTER_SECONDS)
+
+@asynccontextmanager
+async def _slot(operation: str, deadline: float):
+    """Hold one of the LLM_MAX_IN_FLIGHT request slots.
+
+    Queues for at most LLM_MAX_QUEUE_WAIT_SECONDS, and never past the call's deadline (loop time).
+    """
+    global _waiting
+    semaphore = _semaphore
+    if semaphore.locked():
+        check_admission(operation)
+        llm_pool_saturated.labels(tool="ai-interviewer").inc()
+
+    wait_start = time.perf_counter()
+    _waiting += 1
+    llm_queue_depth.labels(tool="ai-interviewer").inc()
+    try:
+        async with asyncio.timeout_at(min(deadline, asyncio.get_running_loop().time() + settings.LLM_MAX_QUEUE_WAIT_SECONDS)):
+            await semaphore.acquire()
+    except TimeoutError:
+        llm_admission_rejections.labels(tool="ai-interviewer", operation=operation, reason="queue_timeout").inc()
+        raise LLMOverloadedError(settings.LLM_QUEUE_RETRY_AFTER_SECONDS) from None
+    finally:
+        _waiting -= 1
+        llm_queue_depth.labels(tool="ai-interviewer").dec()
+    llm_queue_wait.labels(tool="ai-interviewer").observe(time.perf_counter() - wait_start)
+
+    llm_in_flight.labels(tool="ai-interviewer", operation=operation).inc()
+    try:
+        yield
+    finally:
+        llm_in_flight.labels(tool="ai-interviewer", operation=operation).dec()
+        semaphore.release()
+
+def _record_usage(data: dict, operation: str, model: str):
+    usage = data.get("usage") or {}
+    prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens", 0)) or 0
+    completion_tokens = usage.get("completion_tokens", usage.get("output_tokens", 0)) or 0
+    llm_tokens.labels(tool="ai-interviewer", operation=operation, model=model, kind="prompt").inc(prompt_tokens)
+    llm_tokens.labels(tool="ai-interviewer", operation=operation, model=model, kind="completion").inc(completion_tokens)
+
+def _retry_reason(e: BaseException) -> Optional[str]:
+    """Why a failed request is worth retrying, or None if it is not (e.g. a 400)."""
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == 429:
+            return "rate_limited"
+        if e.response.status_code >= 500:
+            return "server_error"
+        return None
+    if isinstance(e, (httpx.TimeoutException, TimeoutError)):
+        return "timeout"
+    if isinstance(e, httpx.TransportError):
+        return "connection"
+    return None
+
+def _backoff(attempt: int, e: BaseException) -> float:
+    if isinstance(e, httpx.HTTPStatusError):
+        retry_after = e.response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), settings.LLM_RETRY_MAX_DELAY_SECONDS)
+    # Full jitter, so clients retrying after the same outage spread out
+    return random.uniform(0, min(settings.LLM_RETRY_MAX_DELAY_SECONDS, settings.LLM_RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1)))
+
+def _hedge_delay(operation: str) -> Optional[float]:
+    """p95 of recent latencies for the operation, or None if hedging is off, unwarranted or unsafe."""
+    samples = _latencies[operation]
+    if not settings.LLM_HEDGE_ENABLED or len(samples) < _HEDGE_MIN_SAMPLES or _semaphore.locked():
+        # Hedging a saturated pool would only add load
+        return None
+    ordered = sorted(samples)
+    return max(settings.LLM_HEDGE_MIN_DELAY_SECONDS, ordered[int(len(ordered) * 0.95) - 1])
+
+def _deadline(interactive: bool) -> float:
+    """Loop time by which a call must finish, all of its attempts included."""
+    budget = settings.LLM_INTERACTIVE_BUDGET_SECONDS if interactive else settings.LLM_BACKGROUND_BUDGET_SECONDS
+    return asyncio.get_running_loop().time() + budget
+
+def _retry_fits(reason: str, delay: float, deadline: float) -> bool:
+    """Whether another attempt, started after `delay`, can finish before the deadline.
+
+    A timed-out attempt is only retried with a full LLM_TIMEOUT_SECONDS left: a
+    shorter one would most likely time out as well.
+    """
+    remaining = deadline - asyncio.get_running_loop().time() - delay
+    return remaining >= settings.LLM_TIMEOUT_SECONDS if reason == "timeout" else remaining > 0
+
+async def post_chat_completion(payload: dict, operation: str = "chat", interactive: bool = False) -> dict:
+    """POST a chat completion through the shared pool, capped at LLM_MAX_IN_FLIGHT.
+
+    Retryable failures are retried with backoff, slow requests may be hedged, and
+    LLMUnavailableError is raised immediately while the circuit breaker is open.
+    LLMOverloadedError is raised, without retrying, when the request queue is full.
+    The whole call is bounded by LLM_INTERACTIVE_BUDGET_SECONDS or
+    LLM_BACKGROUND_BUDGET_SECONDS, depending on `interactive`.
+    """
+    if _client is None:
+        # Scripts and one-off callers run outside the app lifespan
+        await init_client()
+
+    model = payload.get("model", "unknown")
+    deadline = _deadline(interactive)
+    for attempt in range(1, settings.LLM_RETRY_MAX_ATTEMPTS + 1):
+        _breaker.check(operation)
+        try:
+            data = await _hedged(payload, operation, model, deadline)
+        except LLMOverloadedError:
+            # Never reached the proxy; says nothing about its health
+            raise
+        except Exception as e:
+            reason = _retry_reason(e)
+            if reason is None:
+                # The proxy answered; the request itself is at fault
+                _breaker.record_success()
+                raise
+            _breaker.record_failure()
+            delay = _backoff(attempt, e)
+            if attempt == settings.LLM_RETRY_MAX_ATTEMPTS or not _retry_fits(reason, delay, deadline):
+                raise
+            llm_retries.labels(tool="ai-interviewer", operation=operation, reason=reason).inc()
+            await asyncio.sleep(delay)
+            continue
+        _breaker.record_success()
+        _record_usage(data, operation, model)
+        return data
+
+async def _hedged(payload: dict, operation: str, model: str, deadline: float) -> dict:
+    delay = _hedge_delay(operation)
+    if delay is None:
+        return await _send(payload, operation, model, deadline)
+
+    primary = asyncio.ensure_future(_send(payload, operation, model, deadline))
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+
+    hedge = asyncio.ensure_future(_send(payload, operation, model, deadline))
+    pending = {primary, hedge}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    outcome = "hedge_won" if task is hedge else "primary_won"
+                    llm_hedged_requests.labels(tool="ai-interviewer", operation=operation, outcome=outcome).inc()
+                    return task.result()
+                error = task.exception()
+        llm_hedged_requests.labels(tool="ai-interviewer", operation=operation, outcome="both_failed").inc()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def _send(payload: dict, operation: str, model: str, deadline: float) -> dict:
+    async with _slot(operation, deadline):
+        start = time.perf_counter()
+        try:
+            # Bounds the whole attempt; the client timeout only bounds each read
+            async with asyncio.timeout_at(min(deadline, asyncio.get_running_loop().time() + settings.LLM_TIMEOUT_SECONDS)):
+                response = await _client.post("/v1/chat/completions", json=payload)
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            llm_request_errors.labels(tool="ai-interviewer", operation=operation, error=type(e).__name__).inc()
+            raise
+        finally:
+            llm_request_duration.labels(tool="ai-interviewer", operation=operation, model=model).observe(time.perf_counter() - start)
+
+    _latencies[operation].append(time.perf_counter() - start)
+    return data
+
+async def stream_chat_completion(payload: dict, operation: str = "chat", interactive: bool = False) -> AsyncIterator[str]:
+    """Stream a chat completion (`stream: true`) and yield its content deltas.
+
+    Failures are only retried before the first delta has been yielded. The
+    budget (see post_chat_completion) bounds the time to the first delta; once
+    text is flowing, the stream is not cut off.
+    """
+    if _client is None:
+        await init_client()
+
+    model = payload.get("model", "unknown")
+    deadline = _deadline(interactive)
+    for attempt in range(1, settings.LLM_RETRY_MAX_ATTEMPTS + 1):
+        _breaker.check(operation)
+        started = False
+        try:
+            async with aclosing(_stream(payload, operation, model, deadline)) as stream:
+                async for delta in stream:
+                    started = True
+                    yield delta
+        except LLMOverloadedError:
+            raise
+        except Exception as e:
+            reason = _retry_reason(e)
+            if reason is None:
+                _breaker.record_success()
+                raise
+            _breaker.record_failure()
+            delay = _backoff(attempt, e)
+            if started or attempt == settings.LLM_RETRY_MAX_ATTEMPTS or not _retry_fits(reason, delay, deadline):
+                raise
+            llm_retries.labels(tool="ai-interviewer", operation=operation, reason=reason).inc()
+            await asyncio.sleep(delay)
+            continue
+        _breaker.record_success()
+        return
+
+async def _stream(payload: dict, operation: str, model: str, deadline: float) -> AsyncIterator[str]:
+    async with _slot(operation, deadline):
+        start = time.perf_counter()
+        first_token = True
+        try:
+            # Lifted at the first delta
+            first_token_timeout = asyncio.timeout_at(deadline)
+            async with first_token_timeout, _client.stream("POST", "/v1/chat/completions", json={**payload, "stream": True}) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    if chunk.get("usage"):
+                        _record_usage(chunk, operation, model)
+                    choices = chunk.get("choices") or [{}]
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        if first_token:
+                            first_token_timeout.reschedule(None)
+                            llm_time_to_first_token.labels(tool="ai-interviewer", operation=operation, model=model).observe(time.perf_counter() - start)
+                            first_token = False
+                        yield delta
+        except Exception as e:
+            llm_request_errors.labels(tool="ai-interviewer", operation=operation, error=type(e).__name__).inc()
+            raise
+        finally:
+            llm_request_duration.labels(tool="ai-interviewer", operation=operation, model=model).observe(time.perf_counter() - start)
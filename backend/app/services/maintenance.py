@@ -0,0 +1,82 @@
+"""Write-behind for data derived from submissions: interview stats and the search index.
+
+Request handlers and the evaluation worker queue their changes here instead of
+writing them in their own transaction, which keeps the single writer connection
+free. Queued changes are merged and written together in one transaction
+DB_MAINTENANCE_DELAY_SECONDS after the first of them, and on shutdown.
+
+A crash loses at most that window: unindexed submissions are indexed again when
+they are evaluated, and `python -m app.cli rebuild-stats` recomputes the stats.
+"""
+import asyncio
+import logging
+from collections import Counter
+from typing import Optional
+from app.config import get_settings
+from app.database import async_session
+from app.services import interview_stats, submission_search
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# interview id -> (counters, histogram buckets) from interview_stats.delta()
+_stats: dict[str, tuple[Counter, Counter]] = {}
+_unindexed: list[str] = []
+_timer: Optional[asyncio.TimerHandle] = None
+_flushes: set[asyncio.Task] = set()
+
+def submission_added(interview_id: str, submission_id: str):
+    """Queue a new pending submission's stats and search entry."""
+    stats_changed(interview_id, new=("pending", 0.0, []))
+    _unindexed.append(submission_id)
+
+def stats_changed(interview_id: str, old=None, new=None):
+    """Queue a submission's move from `old` to `new` (see interview_stats.delta())."""
+    counters, buckets = interview_stats.delta(old, new)
+    queued_counters, queued_buckets = _stats.setdefault(interview_id, (Counter(), Counter()))
+    queued_counters.update(counters)
+    queued_buckets.update(buckets)
+    _schedule()
+
+def _schedule():
+    global _timer
+    if _timer is None:
+        _timer = asyncio.get_running_loop().call_later(settings.DB_MAINTENANCE_DELAY_SECONDS, _start_flush)
+
+def _start_flush():
+    global _timer
+    _timer = None
+    task = asyncio.create_task(flush())
+    _flushes.add(task)
+    task.add_done_callback(_flushes.discard)
+
+async def flush():
+    """Write everything queued so far. Failed writes are queued again."""
+    global _stats, _unindexed, _timer
+    if _timer is not None:
+        _timer.cancel()
+        _timer = None
+    stats, unindexed = _stats, _unindexed
+    _stats, _unindexed = {}, []
+    if not stats and not unindexed:
+        return
+
+    try:
+        async with async_session() as db:
+            await interview_stats.apply_deltas(stats, db)
+            if unindexed:
+                await submission_search.index_submissions(unindexed, db)
+            await db.commit()
+    except Exception:
+        logger.exception("Writing %d stats changes and %d search entries failed", len(stats), len(unindexed))
+        for interview_id, (counters, buckets) in stats.items():
+            queued_counters, queued_buckets = _stats.setdefault(interview_id, (Counter(), Counter()))
+            queued_counters.update(counters)
+            queued_buckets.update(buckets)
+        _unindexed.extend(unindexed)
+        _schedule()
+
+async def stop():
+    """Write what is still queued, for shutdown."""
+    await asyncio.gather(*_flushes, return_exceptions=True)
+    await flush()
@@ -0,0 +1,300 @@
+"""Question bank: reuse earlier generated questions for similar job specs.
+
+Every question the LLM generates is stored in the question_bank table with the
+job spec it was written for. Each worker keeps a TF-IDF index of the distinct
+specs in memory and scores a new job spec against them. Questions are taken
+from the best-matching specs first, in the order they were generated, so an
+identical spec gets its own question set back. A question too similar to one
+already picked (e.g. a paraphrase from another generation) is skipped.
+
+The index is inverted (per term: the positions of the specs containing it and
+their normalized weights), so a search only touches the postings of the spec's
+terms and takes a few milliseconds with 100k+ questions. New rows are picked up
+at most every QUESTION_BANK_REFRESH_SECONDS, and the index is rebuilt in a
+thread so the event loop keeps serving requests.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.database import read_session
+from app.models.interview import QuestionBankEntry
+from app.metrics import question_bank_lookups, question_bank_size, question_bank_search_duration
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_STOPWORDS = frozenset(
+    "a an and any are as at be but by can do does for from has have how i if in is it its of on or our "
+    "that the their them this to was we were what when where which who why will with would you your".split()
+)
+# Most specs scored per lookup; questions are only taken from these
+_MAX_SPECS = 20
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def _normalize_skills(key_skills: list[str]) -> list[str]:
+    return sorted({_normalize(s) for s in key_skills if s.strip()})
+
+def _tokens(*texts: str) -> list[str]:
+    return [t for text in texts for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+def _spec_tokens(job_title: str, job_requirements: str, skills: list[str]) -> list[str]:
+    return _tokens(job_title, job_requirements, " ".join(skills))
+
+class _Corpus:
+    """Term ids and sublinear tf weights of every loaded spec, and its questions. Only grows."""
+
+    def __init__(self):
+        self.vocabulary: dict[str, int] = {}
+        self.spec_ids: dict[tuple, int] = {}
+        self.terms: list[np.ndarray] = []
+        self.tfs: list[np.ndarray] = []
+        self.skills: list[list[str]] = []
+        self.spec_questions: list[list[int]] = []  # per spec, question positions in generation order
+        self.questions: list[dict] = []
+        self.question_terms: list[Counter] = []
+        self.last_id = 0
+
+    def _counts(self, tokens: list[str]) -> Counter:
+        return Counter(self.vocabulary.setdefault(token, len(self.vocabulary)) for token in tokens)
+
+    def extend(self, rows):
+        for row in rows:
+            skills = row.key_skills or []
+            key = (_normalize(row.job_title), _normalize(row.job_requirements), tuple(skills))
+            spec = self.spec_ids.get(key)
+            if spec is None:
+                spec = self.spec_ids[key] = len(self.terms)
+                counts = self._counts(_spec_tokens(row.job_title, row.job_requirements, skills))
+                self.terms.append(np.fromiter(counts.keys(), dtype=np.int32, count=len(counts)))
+                self.tfs.append(1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts))))
+                self.skills.append(skills)
+                self.spec_questions.append([])
+            self.spec_questions[spec].append(len(self.questions))
+            self.questions.append({"text": row.text, "expected_focus": row.expected_focus or ""})
+            self.question_terms.append(self._counts(_tokens(row.text)))
+            self.last_id = row.id
+
+@dataclass(frozen=True)
+class _Index:
+    """Immutable snapshot of the corpus; specs in compressed sparse column form."""
+    vocabulary: dict[str, int]
+    idf: np.ndarray  # per term
+    indptr: np.ndarray  # postings of term t are positions[indptr[t]:indptr[t + 1]]
+    positions: np.ndarray  # spec positions
+    weights: np.ndarray  # tf-idf, L2-normalized per spec
+    skills: dict[str, np.ndarray]  # normalized skill -> positions of specs listing it
+    spec_questions: list[tuple[int, ...]]
+    questions: list[dict]
+    question_terms: list[Counter]
+
+    @property
+    def size(self) -> int:
+        return len(self.questions)
+
+    @property
+    def specs(self) -> int:
+        return len(self.spec_questions)
+
+def _build_index(corpus: _Corpus) -> _Index:
+    size = len(corpus.terms)
+    vocabulary_size = len(corpus.vocabulary)
+    lengths = np.fromiter((len(t) for t in corpus.terms), dtype=np.int64, count=size)
+    terms = np.concatenate(corpus.terms) if size else np.zeros(0, dtype=np.int32)
+    tfs = np.concatenate(corpus.tfs) if size else np.zeros(0, dtype=np.float32)
+    positions = np.repeat(np.arange(size, dtype=np.int32), lengths)
+
+    df = np.bincount(terms, minlength=vocabulary_size)
+    idf = (np.log((size + 1) / (df + 1)) + 1).astype(np.float32)
+    weights = tfs * idf[terms]
+    norms = np.sqrt(np.bincount(positions, weights=weights * weights, minlength=size)).astype(np.float32)
+    weights /= np.maximum(norms, 1e-12)[positions]
+
+    order = np.argsort(terms, kind="stable")
+    indptr = np.zeros(vocabulary_size + 1, dtype=np.int64)
+    np.cumsum(df, out=indptr[1:])
+
+    skill_positions: dict[str, list[int]] = {}
+    for position, skills in enumerate(corpus.skills):
+        for skill in skills:
+            skill_positions.setdefault(skill, []).append(position)
+
+    return _Index(
+        vocabulary=dict(corpus.vocabulary),
+        idf=idf,
+        indptr=indptr,
+        positions=positions[order],
+        weights=weights[order],
+        skills={skill: np.array(p, dtype=np.int32) for skill, p in skill_positions.items()},
+        spec_questions=[tuple(q) for q in corpus.spec_questions],
+        questions=list(corpus.questions),
+        question_terms=list(corpus.question_terms)
+    )
+
+def _scores(index: _Index, tokens: list[str]) -> np.ndarray:
+    """Cosine similarity of the token list to every spec in the index."""
+    counts = Counter(index.vocabulary[t] for t in tokens if t in index.vocabulary)
+    if not counts:
+        return np.zeros(index.specs, dtype=np.float32)
+    terms = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    query = (1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * index.idf[terms]
+    query /= np.linalg.norm(query)
+    slices = [slice(index.indptr[t], index.indptr[t + 1]) for t in terms]
+    positions = np.concatenate([index.positions[s] for s in slices])
+    weights = np.concatenate([index.weights[s] * q for s, q in zip(slices, query)])
+    return np.bincount(positions, weights=weights, minlength=index.specs)
+
+def _question_vector(index: _Index, position: int) -> dict[int, float]:
+    # Terms only seen in questions have a spec document frequency of 0, i.e. the highest idf
+    vector = {
+        term: (1 + np.log(count)) * float(index.idf[term])
+        for term, count in index.question_terms[position].items()
+    }
+    norm = np.sqrt(sum(w * w for w in vector.values())) or 1.0
+    return {term: w / norm for term, w in vector.items()}
+
+def _overlap(a: dict[int, float], b: dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(term, 0.0) for term, w in a.items())
+
+def _pick(index: _Index, scores: np.ndarray, count: int) -> list[int]:
+    """Question positions from the best specs above the threshold, skipping near-duplicates.
+
+    A greedy, relevance-ordered variant of maximal marginal relevance: specs
+    are visited best first and their questions in generation order, and a
+    question is kept only if its overlap with every kept one is below
+    QUESTION_BANK_MAX_OVERLAP.
+    """
+    candidates = min(_MAX_SPECS, index.specs)
+    best = np.argpartition(-scores, candidates - 1)[:candidates]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    picked: list[int] = []
+    vectors: list[dict[int, float]] = []
+    for spec in best.tolist():
+        if scores[spec] < settings.QUESTION_BANK_MIN_SIMILARITY:
+            break
+        for position in index.spec_questions[spec]:
+            vector = _question_vector(index, position)
+            if any(_overlap(vector, other) >= settings.QUESTION_BANK_MAX_OVERLAP for other in vectors):
+                continue
+            picked.append(position)
+            vectors.append(vector)
+            if len(picked) == count:
+                return picked
+    return picked
+
+_corpus = _Corpus()
+_index: Optional[_Index] = None
+_refreshed_at = 0.0
+_refresh_task: Optional[asyncio.Task] = None
+
+def _extend_and_build(rows) -> _Index:
+    _corpus.extend(rows)
+    return _build_index(_corpus)
+
+async def refresh():
+    """Load questions added since the last refresh (by any worker) and rebuild the index."""
+    global _index, _refreshed_at
+    _refreshed_at = time.monotonic()
+    async with read_session() as db:
+        result = await db.execute(
+            select(
+                QuestionBankEntry.id, QuestionBankEntry.text, QuestionBankEntry.expected_focus,
+                QuestionBankEntry.job_title, QuestionBankEntry.job_requirements, QuestionBankEntry.key_skills
+            )
+            .where(QuestionBankEntry.id > _corpus.last_id)
+            .order_by(QuestionBankEntry.id)
+        )
+        rows = result.all()
+    if rows or _index is None:
+        _index = await asyncio.to_thread(_extend_and_build, rows)
+        question_bank_size.labels(tool="ai-interviewer").set(_index.size)
+
+async def _refresh_in_background():
+    try:
+        await refresh()
+    except Exception:
+        logger.exception("Question bank refresh failed")
+
+def _schedule_refresh(force: bool = False):
+    global _refresh_task
+    if _refresh_task is not None and not _refresh_task.done():
+        return
+    if force or time.monotonic() - _refreshed_at >= settings.QUESTION_BANK_REFRESH_SECONDS:
+        _refresh_task = asyncio.create_task(_refresh_in_background())
+
+def start():
+    """Load the bank in the background; lookups miss until the first load finishes."""
+    if settings.QUESTION_BANK_ENABLED:
+        _schedule_refresh(force=True)
+
+async def find(job_title: str, job_requirements: str, key_skills: list[str]) -> Optional[list[dict]]:
+    """Assemble a question set from the bank, or return None if the spec is not covered well enough."""
+    if not settings.QUESTION_BANK_ENABLED:
+        return None
+    # Lookups never wait for a refresh; they use the current index
+    _schedule_refresh()
+    index, count = _index, settings.QUESTION_BANK_QUESTIONS
+    if index is None or index.size < count:
+        question_bank_lookups.labels(tool="ai-interviewer", result="too_small").inc()
+        return None
+
+    start = time.perf_counter()
+    skills = _normalize_skills(key_skills)
+    scores = _scores(index, _spec_tokens(job_title, job_requirements, skills))
+    if skills:
+        if any(skill not in index.skills for skill in skills):
+            question_bank_lookups.labels(tool="ai-interviewer", result="skills_missing").inc()
+            return None
+        # Only specs sharing one of the skills
+        mask = np.zeros(index.specs, dtype=bool)
+        for skill in skills:
+            mask[index.skills[skill]] = True
+        scores = np.where(mask, scores, 0)
+    picked = _pick(index, scores, count)
+    question_bank_search_duration.labels(tool="ai-interviewer").observe(time.perf_counter() - start)
+
+    if len(picked) < count:
+        question_bank_lookups.labels(tool="ai-interviewer", result="below_threshold").inc()
+        return None
+    question_bank_lookups.labels(tool="ai-interviewer", result="hit").inc()
+    return [{"id": number, **index.questions[position]} for number, position in enumerate(picked, start=1)]
+
+async def add(job_title: str, job_requirements: str, key_skills: list[str], questions: list[dict], db: AsyncSession):
+    """Store freshly generated questions; persisted by the caller's commit.
+
+    Questions whose normalized text is already in the bank are skipped.
+    """
+    if not settings.QUESTION_BANK_ENABLED:
+        return
+    skills = _normalize_skills(key_skills)
+    rows = {}
+    for question in questions:
+        text = question.get("text")
+        if not isinstance(text, str) or not text.strip():
+            continue
+        text_hash = hashlib.sha256(_normalize(text).encode()).hexdigest()
+        rows[text_hash] = {
+            "text_hash": text_hash,
+            "text": text,
+            "expected_focus": str(question.get("expected_focus") or ""),
+            "job_title": job_title,
+            "job_requirements": job_requirements,
+            "key_skills": skills
+        }
+    if rows:
+        stmt = insert(QuestionBankEntry).on_conflict_do_nothing(index_elements=[QuestionBankEntry.text_hash])
+        await db.execute(stmt, list(rows.values()))
@@ -0,0 +1,73 @@
+import hashlib
+import json
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models.interview import QuestionCacheEntry
+from app.services import question_bank
+from app.services.ai_service import generate_questions, uses_fallback
+from app.services.cache import TwoTierCache
+from app.metrics import question_cache_hits, question_cache_misses, question_cache_evictions
+
+settings = get_settings()
+
+_cache = TwoTierCache(
+    QuestionCacheEntry, "questions",
+    memory_entries=settings.QUESTION_CACHE_MEMORY_ENTRIES,
+    ttl_seconds=settings.QUESTION_CACHE_TTL_SECONDS,
+    max_rows=settings.QUESTION_CACHE_MAX_ROWS,
+    hits=question_cache_hits,
+    misses=question_cache_misses,
+    evictions=question_cache_evictions
+)
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def cache_key(job_title: str, job_requirements: str, key_skills: list[str]) -> str:
+    """Hash of the job spec, insensitive to case, whitespace and skill order."""
+    normalized = {
+        "title": _normalize(job_title),
+        "requirements": _normalize(job_requirements),
+        "skills": sorted({_normalize(s) for s in key_skills if s.strip()})
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+async def get_cached(key: str, db: AsyncSession) -> Optional[list[dict]]:
+    return await _cache.get(key, db)
+
+async def store(key: str, questions: list[dict], db: AsyncSession):
+    await _cache.store(key, questions, db)
+
+async def get_questions(
+    job_title: str,
+    job_requirements: str,
+    key_skills: list[str],
+    db: AsyncSession,
+    use_cache: bool = True
+) -> list[dict]:
+    """Return questions for a job spec, generating them only on a cache miss.
+
+    Misses are served from the question bank when it has similar enough
+    questions, and from the LLM otherwise. Cache and bank writes are added to
+    `db` and persisted by the caller's commit.
+    """
+    if not use_cache:
+        return await generate_questions(job_title, job_requirements, key_skills)
+
+    key = cache_key(job_title, job_requirements, key_skills)
+    questions = await get_cached(key, db)
+    if questions is not None:
+        return questions
+
+    # End the lookup transaction so the writer connection is not held during the LLM call
+    await db.commit()
+    questions = await question_bank.find(job_title, job_requirements, key_skills)
+    if questions is None:
+        questions = await generate_questions(job_title, job_requirements, key_skills)
+        # Never cache or bank the generic fallback set
+        if uses_fallback(questions, job_title):
+            return questions
+        await question_bank.add(job_title, job_requirements, key_skills, questions, db)
+    await store(key, questions, db)
+    return questions
@@ -0,0 +1,105 @@
+"""Token-bucket rate limits for the LLM-backed endpoints.
+
+Each scope ("device", "interview", "ip", "draft") has a refill rate and burst size from
+Settings. Buckets are keyed on (scope, key) and kept in an LRU, so idle keys are
+dropped. Limits are enforced per worker process: with N workers a client can get
+up to N times the configured rate.
+
+Behind the bundled nginx every request comes from the proxy's address, so the
+client IP is taken from X-Real-IP (or the last X-Forwarded-For hop) when
+RATE_LIMIT_TRUST_FORWARDED_FOR is set and the peer is a trusted proxy.
+"""
+import ipaddress
+import math
+import time
+from typing import Callable, Optional
+from fastapi import Request
+from app.config import get_settings
+from app.metrics import rate_limited_requests
+from app.services.cache import LRUCache
+
+settings = get_settings()
+
+_LIMITS = {
+    "device": (settings.RATE_LIMIT_DEVICE_PER_MINUTE / 60, settings.RATE_LIMIT_DEVICE_BURST),
+    "interview": (settings.RATE_LIMIT_INTERVIEW_PER_MINUTE / 60, settings.RATE_LIMIT_INTERVIEW_BURST),
+    "ip": (settings.RATE_LIMIT_IP_PER_MINUTE / 60, settings.RATE_LIMIT_IP_BURST),
+    "draft": (settings.RATE_LIMIT_DRAFT_PER_MINUTE / 60, settings.RATE_LIMIT_DRAFT_BURST),
+}
+
+_TRUSTED_PROXIES = [
+    ipaddress.ip_network(network.strip(), strict=False)
+    for network in settings.RATE_LIMIT_TRUSTED_PROXIES.split(",") if network.strip()
+]
+
+# (scope, key) -> (tokens, monotonic time of last update)
+_buckets = LRUCache(settings.RATE_LIMIT_MAX_KEYS)
+
+class RateLimitedError(Exception):
+    """Raised when a request exceeds one of its rate limits; answered with 429."""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded ({scope}), retry in {math.ceil(retry_after)}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _TRUSTED_PROXIES)
+
+def client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else "unknown"
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR and _is_trusted_proxy(peer):
+        # The proxy sets X-Real-IP and appends the last X-Forwarded-For hop; earlier hops
+        # come from the client and could be forged to get a fresh bucket
+        forwarded = request.headers.get("x-real-ip", "").strip() or request.headers.get("x-forwarded-for", "").split(",")[-1].strip()
+        if forwarded:
+            return forwarded
+    return peer
+
+_KEY_FUNCS: dict[str, Callable[[Request], Optional[str]]] = {
+    "device": lambda request: request.headers.get("x-device-id"),
+    "interview": lambda request: request.path_params.get("interview_id"),
+    "ip": client_ip,
+    "draft": client_ip,
+}
+
+def request_keys(request: Request, *scopes: str) -> list[tuple[str, str]]:
+    """(scope, key) pairs for the request; scopes whose key is missing are skipped."""
+    keys = []
+    for scope in scopes:
+        key = _KEY_FUNCS[scope](request)
+        if key:
+            keys.append((scope, key))
+    return keys
+
+def take(keys: list[tuple[str, str]], cost: float = 1.0):
+    """Take `cost` tokens from every bucket, or from none and raise RateLimitedError.
+
+    A cost larger than a scope's burst is capped at the burst, so it empties the
+    bucket instead of never fitting.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    now = time.monotonic()
+    updates = []
+    for scope, key in keys:
+        rate, burst = _LIMITS[scope]
+        tokens, updated_at = _buckets.get((scope, key), (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        needed = min(cost, burst)
+        if tokens < needed:
+            rate_limited_requests.labels(tool="ai-interviewer", scope=scope).inc()
+            raise RateLimitedError(scope, (needed - tokens) / rate)
+        updates.append(((scope, key), tokens - needed))
+    for bucket, tokens in updates:
+        _buckets.set(bucket, (tokens, now))
+
+def limit(*scopes: str):
+    """FastAPI dependency that takes one token per request from each of `scopes`."""
+    async def dependency(request: Request):
+        take(request_keys(request, *scopes))
+    return dependency
@@ -0,0 +1,164 @@
+"""Full-text search over candidate answers, per-question comments and AI summaries.
+
+An SQLite FTS5 table holds one row per submission. Rows carry the submission's
+id and are found and joined on it, never on the submissions rowid, which VACUUM
+may renumber (submissions have a text primary key). Triggers on the submissions
+table keep the index in sync, so each evaluation or delete only re-indexes
+that submission. New submissions are indexed by index_submissions(), which the
+submit endpoint leaves to app.services.maintenance so its own transaction stays
+short. The submission and interview ids are indexed too
+(with zero rank weight): a trigger finds a submission's row, and a search is
+scoped to one interview, inside the MATCH itself rather than by scanning.
+"""
+import html
+import re
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_ANSWERS = "(SELECT group_concat(json_extract(value, '$.answer'), char(10)) FROM json_each({row}.answers))"
+_COMMENTS = "(SELECT group_concat(json_extract(value, '$.comment'), char(10)) FROM json_each({row}.scores))"
+
+def _values(row: str) -> str:
+    return f"{row}.id, {row}.interview_id, {_ANSWERS.format(row=row)}, {_COMMENTS.format(row=row)}, {row}.ai_summary"
+
+_INSERT = "INSERT INTO submission_search(submission_id, interview_id, answers, comments, summary)"
+_DELETE_OLD = """DELETE FROM submission_search WHERE submission_search MATCH 'submission_id : "' || old.id || '"'"""
+
+_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS submission_search USING fts5(
+        submission_id, interview_id, answers, comments, summary,
+        tokenize = 'porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS submission_search_update
+    AFTER UPDATE OF id, interview_id, answers, scores, ai_summary ON submissions BEGIN
+        {_DELETE_OLD};
+        {_INSERT} VALUES ({_values("new")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS submission_search_delete AFTER DELETE ON submissions BEGIN
+        {_DELETE_OLD};
+    END""",
+]
+
+# Earlier versions indexed new submissions in an insert trigger
+_DROP_INSERT_TRIGGER = "DROP TRIGGER IF EXISTS submission_search_insert"
+
+# The first version keyed the index on submissions.rowid
+_DROP_ROWID_KEYED = [
+    "DROP TRIGGER IF EXISTS submission_search_insert",
+    "DROP TRIGGER IF EXISTS submission_search_update",
+    "DROP TRIGGER IF EXISTS submission_search_delete",
+    "DROP TABLE submission_search",
+]
+
+_REINDEX = [
+    "DELETE FROM submission_search",
+    f"{_INSERT} SELECT {_values('submissions')} FROM submissions",
+]
+
+# Searchable columns and their FTS5 column numbers; snippets prefer them in this order
+_COLUMNS = {"answers": 2, "comments": 3, "summary": 4}
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+def install(conn) -> None:
+    """Create the index and its triggers (sync, for run_sync); index existing submissions the first time."""
+    existing = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'submission_search'").scalar()
+    if existing is not None and "submission_id" not in existing:
+        for statement in _DROP_ROWID_KEYED:
+            conn.exec_driver_sql(statement)
+        existing = None
+    conn.exec_driver_sql(_DROP_INSERT_TRIGGER)
+    for statement in _DDL:
+        conn.exec_driver_sql(statement)
+    if existing is None:
+        reindex(conn)
+
+def reindex(conn) -> int:
+    """Rebuild the whole index from the submissions table. Returns the number of submissions indexed."""
+    for statement in _REINDEX:
+        conn.exec_driver_sql(statement)
+    return conn.exec_driver_sql("SELECT count(*) FROM submission_search").scalar()
+
+async def index_submissions(submission_ids: list[str], db: AsyncSession):
+    """Add the submissions to the index, in the caller's transaction.
+
+    Submissions the update trigger already indexed (evaluated in the meantime) are skipped.
+    """
+    params = {f"id{n}": submission_id for n, submission_id in enumerate(submission_ids)}
+    await db.execute(
+        text(f"""
+            {_INSERT} SELECT {_values('submissions')} FROM submissions
+            WHERE submissions.id IN ({", ".join(f":{name}" for name in params)})
+            AND NOT EXISTS (
+                SELECT 1 FROM submission_search
+                WHERE submission_search MATCH 'submission_id : "' || submissions.id || '"'
+            )
+        """),
+        params
+    )
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+def fts_query(query: str) -> Optional[str]:
+    """Turn user input into an FTS5 expression, or None if nothing is searchable.
+
+    Words are ANDed, "quoted text" is a phrase, a trailing * makes a prefix
+    search and OR between terms is kept. Everything else is quoted, so input
+    can never be an FTS5 syntax error.
+    """
+    parts: list[str] = []
+    for phrase, word in re.findall(r'"([^"]*)"?|(\S+)', query):
+        if phrase.strip():
+            parts.append(_quote(phrase.strip()))
+        elif word == "OR":
+            if parts and parts[-1] != "OR":
+                parts.append("OR")
+        elif word.rstrip("*"):
+            parts.append(_quote(word.rstrip("*")) + ("*" if word.endswith("*") else ""))
+    while parts and parts[-1] == "OR":
+        parts.pop()
+    return " ".join(parts) or None
+
+def _highlight(snippet: str) -> str:
+    # Answers are candidate input: escape them, then turn the match markers into <mark>
+    return html.escape(snippet).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+async def search(interview_id: str, expression: str, db: AsyncSession, limit: int, offset: int) -> tuple[int, list[dict]]:
+    """Return (total hits, one page of hits ranked by bm25) for submissions of one interview.
+
+    `expression` comes from fts_query().
+    """
+    match = f"interview_id : {_quote(interview_id)} AND {{{' '.join(_COLUMNS)}}} : ({expression})"
+    total = (await db.execute(
+        text("SELECT count(*) FROM submission_search WHERE submission_search MATCH :match"),
+        {"match": match}
+    )).scalar()
+    snippets = ", ".join(
+        f"snippet(submission_search, {index}, char(2), char(3), '…', 16) AS {name}"
+        for name, index in _COLUMNS.items()
+    )
+    result = await db.execute(
+        text(f"""
+            SELECT s.id, s.candidate_name, s.candidate_email, s.overall_score, s.recommendation, {snippets}
+            FROM submission_search JOIN submissions s ON s.id = submission_search.submission_id
+            WHERE submission_search MATCH :match AND s.interview_id = :interview_id
+            ORDER BY bm25(submission_search, 0.0, 0.0, 1.0, 0.5, 0.75)
+            LIMIT :limit OFFSET :offset
+        """),
+        {"match": match, "interview_id": interview_id, "limit": limit, "offset": offset}
+    )
+    hits = []
+    for row in result.mappings():
+        # Snippet of the first column that actually matched
+        matched_in = next((name for name in _COLUMNS if row[name] and _MARK_START in row[name]), "answers")
+        hits.append({
+            "submission_id": row["id"],
+            "candidate_name": row["candidate_name"],
+            "candidate_email": row["candidate_email"],
+            "overall_score": row["overall_score"],
+            "recommendation": row["recommendation"],
+            "matched_in": matched_in,
+            "snippet": _highlight(row[matched_in] or "")
+        })
+    return total, hits
@@ -0,0 +1,99 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.interview import TokenBalance, CreditLedgerEntry
+from app.metrics import tokens_consumed, free_trial_used, tokens_refunded
+
+FREE_INTERVIEWS_LIMIT = 1
+
+async def _take_free_trial(device_id: str, db: AsyncSession) -> bool:
+    # One upsert: new devices are created with the trial already used,
+    # existing ones only if they still have a trial left
+    now = datetime.utcnow()
+    stmt = insert(TokenBalance).values(device_id=device_id, balance=0, free_trial_used=1, created_at=now, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TokenBalance.device_id],
+        set_={"free_trial_used": TokenBalance.free_trial_used + 1, "updated_at": now},
+        where=TokenBalance.free_trial_used < FREE_INTERVIEWS_LIMIT
+    ).returning(TokenBalance.id)
+    return (await db.execute(stmt)).first() is not None
+
+async def _take_paid(device_id: str, count: int, db: AsyncSession) -> bool:
+    result = await db.execute(
+        update(TokenBalance)
+        .where(TokenBalance.device_id == device_id, TokenBalance.balance >= count)
+        .values(balance=TokenBalance.balance - count)
+        .returning(TokenBalance.id)
+    )
+    return result.first() is not None
+
+async def reserve_tokens(device_id: str, db: AsyncSession, count: int = 1) -> Optional[tuple[int, int]]:
+    """Debit `count` interviews, free trials first, with conditional writes that cannot overdraw.
+
+    Returns (free_trials, paid_tokens) taken, or None if the device cannot cover
+    `count`; in that case the transaction is rolled back. The caller commits.
+    """
+    trials = 0
+    while trials < min(count, FREE_INTERVIEWS_LIMIT) and await _take_free_trial(device_id, db):
+        trials += 1
+
+    paid = count - trials
+    if paid and not await _take_paid(device_id, paid, db):
+        await db.rollback()
+        return None
+
+    if trials:
+        free_trial_used.labels(tool="ai-interviewer").inc(trials)
+    if paid:
+        tokens_consumed.labels(tool="ai-interviewer").inc(paid)
+    return trials, paid
+
+async def refund_tokens(device_id: str, trials: int, paid: int, db: AsyncSession):
+    """Give back a reservation whose interviews were never created. The caller commits."""
+    if not trials and not paid:
+        return
+    await db.execute(
+        update(TokenBalance)
+        .where(TokenBalance.device_id == device_id)
+        .values(
+            free_trial_used=TokenBalance.free_trial_used - trials,
+            balance=TokenBalance.balance + paid
+        )
+    )
+    tokens_refunded.labels(tool="ai-interviewer").inc(trials + paid)
+
+async def credit_purchase(
+    device_id: str,
+    event_key: str,
+    interviews: int,
+    db: AsyncSession,
+    product_id: Optional[str] = None,
+    amount_cents: Optional[int] = None
+) -> bool:
+    """Grant purchased interviews exactly once per `event_key`.
+
+    The ledger insert is rejected by its unique index when the event was already
+    credited (a webhook retry); otherwise the balance is incremented in one
+    upsert. Returns whether credit was granted. The caller commits.
+    """
+    now = datetime.utcnow()
+    entry = await db.execute(
+        insert(CreditLedgerEntry)
+        .values(
+            event_key=event_key, device_id=device_id, delta=interviews,
+            product_id=product_id, amount_cents=amount_cents, created_at=now
+        )
+        .on_conflict_do_nothing(index_elements=[CreditLedgerEntry.event_key])
+        .returning(CreditLedgerEntry.id)
+    )
+    if entry.first() is None:
+        return False
+
+    stmt = insert(TokenBalance).values(device_id=device_id, balance=interviews, free_trial_used=0, created_at=now, updated_at=now)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[TokenBalance.device_id],
+        set_={"balance": TokenBalance.balance + stmt.excluded.balance, "updated_at": now}
+    ))
+    return True
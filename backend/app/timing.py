@@ -0,0 +1,65 @@
+"""Per-request timing breakdown, reported in the Server-Timing header.
+
+The request middleware calls `start_request()`; DB, LLM and serialization code
+then `record()` into that request's dict via a context variable. Outside a
+request (background workers, scripts) recording is a no-op.
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+import fastapi.routing
+from fastapi.responses import JSONResponse
+
+_timings: ContextVar[Optional[dict[str, float]]] = ContextVar("server_timings", default=None)
+
+def start_request() -> dict[str, float]:
+    timings: dict[str, float] = {}
+    _timings.set(timings)
+    return timings
+
+def record(name: str, seconds: float):
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+@contextmanager
+def timed(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+def server_timing_header(timings: dict[str, float], total: float) -> str:
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+def time_serialization():
+    """Report FastAPI's response-model validation and jsonable_encoder as "serialize".
+
+    FastAPI's request handler calls `fastapi.routing.serialize_response` for
+    every endpoint result before the response class sees it, so it is wrapped
+    in place. Together with TimedJSONResponse this covers all the work between
+    the endpoint returning and the body bytes existing.
+    """
+    original = fastapi.routing.serialize_response
+    if getattr(original, "_timed", False):
+        return
+
+    @functools.wraps(original)
+    async def serialize_response(*args, **kwargs):
+        with timed("serialize"):
+            return await original(*args, **kwargs)
+
+    serialize_response._timed = True
+    fastapi.routing.serialize_response = serialize_response
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that adds its JSON encoding time to "serialize"."""
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return super().render(content)
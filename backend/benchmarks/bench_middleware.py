@@ -0,0 +1,69 @@
+"""Per-request cost of the request-tracking middleware helpers.
+
+Compares the previous crawler check (lowercasing the user agent once per
+pattern) with the pre-lowercased matcher, then drives the app with distinct
+interview ids to show that route-template labels keep the number of
+http_requests_total series flat.
+
+Usage (from backend/):
+    python -m benchmarks.bench_middleware [--iterations 200000] [--requests 500]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import timeit
+import uuid
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx
+from prometheus_client import REGISTRY
+from app.main import app, BOT_PATTERNS, match_bot
+
+USER_AGENTS = {
+    "browser": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36",
+    "bot": "Mozilla/5.0 (compatible; YandexBot/3.0; +http://yandex.com/bots)",
+}
+
+def _old_match_bot(ua: str):
+    for bot in BOT_PATTERNS:
+        if bot.lower() in ua.lower():
+            return bot
+    return None
+
+def _series_count() -> int:
+    return sum(
+        1 for metric in REGISTRY.collect() if metric.name == "http_requests"
+        for sample in metric.samples if sample.name == "http_requests_total"
+    )
+
+async def _drive(requests: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            before = _series_count()
+            for _ in range(requests):
+                await client.get(f"/api/v1/interviews/{uuid.uuid4()}")
+            return {"requests": requests, "new_series": _series_count() - before}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    results = {"bot_match_ns_per_request": {}}
+    for kind, ua in USER_AGENTS.items():
+        old = timeit.timeit(lambda: _old_match_bot(ua), number=args.iterations)
+        new = timeit.timeit(lambda: match_bot(ua), number=args.iterations)
+        results["bot_match_ns_per_request"][kind] = {
+            "before": round(old / args.iterations * 1e9),
+            "after": round(new / args.iterations * 1e9),
+        }
+    results["label_cardinality"] = asyncio.run(_drive(args.requests))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Index build time and search latency of the question bank at scale.
+
+Builds the in-memory TF-IDF index over synthetic questions (six per job spec,
+Zipf-distributed words, so common terms have long posting lists like real
+text), then looks up random job specs: scoring the specs and picking
+non-duplicate questions. The index is used directly, without the database.
+
+Usage (from backend/):
+    python -m benchmarks.bench_question_bank [--questions 100000] [--searches 500]
+"""
+import argparse
+import json
+import statistics
+import time
+from types import SimpleNamespace
+import numpy as np
+from app.services import question_bank
+
+WORDS = np.array([f"w{i}" for i in range(20000)])
+PROBABILITIES = 1 / np.arange(1, len(WORDS) + 1)
+PROBABILITIES /= PROBABILITIES.sum()
+SKILLS = [f"skill{i}" for i in range(500)]
+
+def _texts(rng: np.random.Generator, count: int, words: int) -> list[str]:
+    return [" ".join(row) for row in rng.choice(WORDS, size=(count, words), p=PROBABILITIES)]
+
+def _rows(count: int, rng: np.random.Generator) -> list[SimpleNamespace]:
+    specs = -(-count // 6)
+    titles, requirements = _texts(rng, specs, 3), _texts(rng, specs, 40)
+    skills = [sorted(rng.choice(SKILLS, size=3, replace=False)) for _ in range(specs)]
+    columns = zip(_texts(rng, count, 20), _texts(rng, count, 8))
+    return [
+        SimpleNamespace(
+            id=row_id,
+            job_title=titles[(row_id - 1) // 6],
+            job_requirements=requirements[(row_id - 1) // 6],
+            key_skills=skills[(row_id - 1) // 6],
+            text=text,
+            expected_focus=focus
+        )
+        for row_id, (text, focus) in enumerate(columns, start=1)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=100000)
+    parser.add_argument("--searches", type=int, default=500)
+    args = parser.parse_args()
+    rng = np.random.default_rng(42)
+    rows = _rows(args.questions, rng)
+
+    corpus = question_bank._Corpus()
+    start = time.perf_counter()
+    corpus.extend(rows)
+    tokenize_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    index = question_bank._build_index(corpus)
+    build_seconds = time.perf_counter() - start
+
+    latencies = []
+    specs = zip(_texts(rng, args.searches, 3), _texts(rng, args.searches, 40))
+    for title, requirements in specs:
+        tokens = question_bank._spec_tokens(title, requirements, list(rng.choice(SKILLS, size=2, replace=False)))
+        start = time.perf_counter()
+        scores = question_bank._scores(index, tokens)
+        question_bank._pick(index, scores, 6)
+        latencies.append(time.perf_counter() - start)
+    ordered = sorted(latencies)
+
+    print(json.dumps({
+        "questions": index.size,
+        "specs": index.specs,
+        "vocabulary": len(index.vocabulary),
+        "postings": int(index.positions.size),
+        "index_mb": round((index.positions.nbytes + index.weights.nbytes + index.indptr.nbytes) / 2**20, 1),
+        "tokenize_seconds": round(tokenize_seconds, 2),
+        "build_seconds": round(build_seconds, 2),
+        "search_p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "search_p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 2),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Concurrent read/write throughput of the SQLite setup, before and after tuning.
+
+"baseline" is the original setup: one bare aiosqlite engine (rollback journal,
+default pragmas) shared by readers and writers. "tuned" is app.database: WAL and
+pragmas, a single writer connection and a pool of query-only readers.
+
+Writers insert submissions and commit one at a time (submit_answers); readers
+run the first page of the results dashboard (get_results).
+
+Usage (from backend/):
+    python -m benchmarks.bench_sqlite [--seconds 10] [--writers 4] [--readers 16] [--rows 2000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.database import Base, create_engine_for
+from app.config import get_settings
+from app.models.interview import Interview, Submission
+
+async def _seed(engine, rows: int) -> str:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session() as db:
+        interview = Interview(job_title="Bench", job_requirements="Bench", questions=[{"id": 1, "text": "Q", "expected_focus": "F"}])
+        db.add(interview)
+        await db.flush()
+        db.add_all([
+            Submission(
+                interview_id=interview.id,
+                candidate_name=f"Candidate {i}",
+                candidate_email=f"c{i}@example.com",
+                answers=[{"question_id": 1, "answer": "x" * 400}],
+                scores=[{"question_id": 1, "score": i % 5 + 1, "comment": "ok"}],
+                overall_score=(i % 50) / 10,
+                recommendation="maybe"
+            )
+            for i in range(rows)
+        ])
+        await db.commit()
+        return interview.id
+
+async def _run(write_engine, read_engine, interview_id: str, args) -> dict:
+    write_session = async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    read_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    deadline = time.perf_counter() + args.seconds
+    read_latencies, write_latencies = [], []
+    errors = {"read": 0, "write": 0}
+    counter = iter(range(10**9))
+
+    async def writer():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                async with write_session() as db:
+                    n = next(counter)
+                    db.add(Submission(
+                        interview_id=interview_id,
+                        candidate_name=f"Writer {n}",
+                        candidate_email=f"w{n}@example.com",
+                        answers=[{"question_id": 1, "answer": "y" * 400}]
+                    ))
+                    await db.commit()
+                write_latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors["write"] += 1
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                async with read_session() as db:
+                    await db.execute(
+                        select(Submission.id, Submission.overall_score, Submission.scores)
+                        .where(Submission.interview_id == interview_id)
+                        .order_by(Submission.overall_score.desc())
+                        .limit(100)
+                    )
+                    await db.execute(select(func.count()).where(Submission.interview_id == interview_id))
+                read_latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors["read"] += 1
+
+    await asyncio.gather(*[writer() for _ in range(args.writers)], *[reader() for _ in range(args.readers)])
+
+    def summarize(latencies):
+        if not latencies:
+            return {"ops_per_sec": 0}
+        ordered = sorted(latencies)
+        return {
+            "ops_per_sec": round(len(latencies) / args.seconds, 1),
+            "p50_ms": round(statistics.median(ordered) * 1000, 2),
+            "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 2),
+        }
+
+    return {"reads": summarize(read_latencies), "writes": summarize(write_latencies), "errors": errors}
+
+async def bench(args) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'baseline.db')}"
+        engine = create_async_engine(url)
+        interview_id = await _seed(engine, args.rows)
+        results["baseline"] = await _run(engine, engine, interview_id, args)
+        await engine.dispose()
+
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'tuned.db')}"
+        write_engine = create_engine_for(url)
+        read_engine = create_engine_for(url, read_only=True, pool_size=get_settings().DB_READ_POOL_SIZE)
+        interview_id = await _seed(write_engine, args.rows)
+        results["tuned"] = await _run(write_engine, read_engine, interview_id, args)
+        await write_engine.dispose()
+        await read_engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(bench(args)), indent=2))
+
+if __name__ == "__main__":
+    main()
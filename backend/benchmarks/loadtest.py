@@ -0,0 +1,318 @@
+"""End-to-end load test against local stubs of the LLM proxy and Creem.
+
+Starts benchmarks.stub_services and the app (uvicorn, on a temporary SQLite
+database) as subprocesses. It funds a few devices through the signed payment
+webhook and seeds some interviews. Then it drives a weighted mix of
+create / get / submit / results / checkout+webhook traffic from concurrent
+virtual users. Prints a JSON report with p50/p95/p99 latency, throughput and
+error rate per operation, plus the stub's LLM call counters.
+
+Pass a previous report as --baseline to include the relative change of each
+operation's p95 and throughput, for comparing commits.
+
+Usage (from backend/):
+    python -m benchmarks.loadtest [--duration 30] [--users 20]
+        [--mix create=1,get=20,submit=5,results=2,webhook=1]
+        [--llm-latency-ms 800] [--llm-latency-sigma 0.5] [--llm-malformed-rate 0]
+        [--llm-completion-tokens 400] [--workers 1] [--rate-limits]
+        [--output report.json] [--baseline old.json]
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEBHOOK_SECRET = "bench-webhook-secret"
+PRODUCT_IDS = {"starter": "prod_starter", "pro": "prod_pro", "unlimited": "prod_unlimited"}
+JOB_TITLES = [
+    "Backend Engineer", "Frontend Engineer", "Data Analyst", "Product Manager", "DevOps Engineer",
+    "Sales Representative", "Customer Success Manager", "QA Engineer", "UX Designer", "Recruiter",
+]
+ANSWER = (
+    "In my last role I led the migration of our billing service to a new platform. "
+    "I planned the rollout in phases, wrote the runbooks and coordinated with support, "
+    "and we finished two weeks early with no customer-facing incidents."
+)
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _percentile(ordered: list[float], p: float) -> float:
+    # Nearest-rank
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def _start(module: str, port: int, env: dict, workers: int = 1) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env={**os.environ, **env}
+    )
+
+async def _wait_ready(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.requests: dict[str, int] = defaultdict(int)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.interviews: list[dict] = []
+        self.devices = [f"bench-device-{i}" for i in range(args.users)]
+
+    async def _call(self, op: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        self.requests[op] += 1
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[op] += 1
+            return None
+        self.latencies[op].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[op] += 1
+            return None
+        return response
+
+    async def checkout_and_webhook(self, device_id: str, product: str = "starter"):
+        response = await self._call(
+            "checkout", "POST", "/api/v1/payment/checkout",
+            json={"product_id": product, "success_url": "https://bench/ok", "cancel_url": "https://bench/cancel"},
+            headers={"X-Device-Id": device_id}
+        )
+        checkout_id = f"ch_{uuid.uuid4().hex}"
+        if response is not None:
+            checkout_id = response.json()["checkout_url"].rsplit("/", 1)[-1]
+        body = json.dumps({
+            "id": f"evt_{uuid.uuid4().hex}",
+            "type": "checkout.completed",
+            "data": {"id": checkout_id, "metadata": {"device_id": device_id, "product_key": product}}
+        }).encode()
+        signature = hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+        await self._call(
+            "webhook", "POST", "/api/v1/payment/webhook",
+            content=body, headers={"creem-signature": signature, "Content-Type": "application/json"}
+        )
+
+    async def create(self, device_id: str):
+        title = random.choice(JOB_TITLES)
+        response = await self._call(
+            "create", "POST", "/api/v1/interviews",
+            json={"job_title": title, "job_requirements": f"Experience as a {title}.", "key_skills": ["communication"]},
+            headers={"X-Device-Id": device_id}
+        )
+        if response is not None:
+            data = response.json()
+            self.interviews.append({"id": data["id"], "code": data["hr_access_code"], "questions": data["questions"]})
+
+    async def get(self, device_id: str):
+        interview = random.choice(self.interviews)
+        await self._call("get", "GET", f"/api/v1/interviews/{interview['id']}")
+
+    async def submit(self, device_id: str):
+        interview = random.choice(self.interviews)
+        await self._call(
+            "submit", "POST", f"/api/v1/interviews/{interview['id']}/submit",
+            json={
+                "candidate_name": "Bench Candidate",
+                "candidate_email": f"{uuid.uuid4().hex[:12]}@bench.example",
+                "answers": [{"question_id": q["id"], "answer": ANSWER} for q in interview["questions"]]
+            }
+        )
+
+    async def results(self, device_id: str):
+        interview = random.choice(self.interviews)
+        await self._call("results", "GET", f"/api/v1/interviews/{interview['id']}/results", params={"code": interview["code"]})
+
+    async def webhook(self, device_id: str):
+        await self.checkout_and_webhook(device_id)
+
+    async def setup(self):
+        for device_id in self.devices:
+            await self.checkout_and_webhook(device_id, "unlimited")
+        await asyncio.gather(*(self.create(self.devices[i % len(self.devices)]) for i in range(self.args.seed_interviews)))
+        if not self.interviews:
+            raise RuntimeError("Seeding failed: no interviews could be created")
+        # Setup traffic is not part of the measurement
+        self.latencies.clear()
+        self.requests.clear()
+        self.errors.clear()
+
+    async def run(self) -> float:
+        ops, weights = zip(*self.args.mix.items())
+        deadline = time.perf_counter() + self.args.duration
+
+        async def user(device_id: str):
+            while time.perf_counter() < deadline:
+                op = random.choices(ops, weights)[0]
+                await getattr(self, op)(device_id)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user(device_id) for device_id in self.devices))
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> dict:
+        operations = {}
+        for op in sorted(self.requests):
+            ordered = sorted(self.latencies[op])
+            operations[op] = {
+                "requests": self.requests[op],
+                "errors": self.errors[op],
+                "error_rate": round(self.errors[op] / self.requests[op], 4),
+                "throughput_rps": round(self.requests[op] / elapsed, 2),
+            }
+            if ordered:
+                operations[op].update({
+                    "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+                    "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+                    "p99_ms": round(_percentile(ordered, 99) * 1000, 1),
+                })
+        requests = sum(self.requests.values())
+        errors = sum(self.errors.values())
+        return {
+            "operations": operations,
+            "total": {
+                "requests": requests,
+                "errors": errors,
+                "error_rate": round(errors / max(requests, 1), 4),
+                "throughput_rps": round(requests / elapsed, 2)
+            }
+        }
+
+def _compare(report: dict, baseline: dict) -> dict:
+    """Relative change per operation (+0.10 = 10% higher than the baseline)."""
+    comparison = {}
+    for op, current in report["operations"].items():
+        previous = baseline.get("operations", {}).get(op)
+        if not previous:
+            continue
+        comparison[op] = {
+            key: round(current[key] / previous[key] - 1, 3)
+            for key in ("p95_ms", "throughput_rps", "error_rate")
+            if current.get(key) is not None and previous.get(key)
+        }
+    return comparison
+
+async def bench(args) -> dict:
+    tmp = tempfile.mkdtemp(prefix="loadtest-")
+    stub_port, app_port = _free_port(), _free_port()
+    stub = _start("benchmarks.stub_services:app", stub_port, {
+        "STUB_LATENCY_MS": str(args.llm_latency_ms),
+        "STUB_LATENCY_SIGMA": str(args.llm_latency_sigma),
+        "STUB_MALFORMED_RATE": str(args.llm_malformed_rate),
+        "STUB_COMPLETION_TOKENS": str(args.llm_completion_tokens),
+    })
+    app_env = {
+        "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(tmp, 'loadtest.db')}",
+        "LLM_PROXY_URL": f"http://127.0.0.1:{stub_port}",
+        "LLM_PROXY_KEY": "bench",
+        "CREEM_API_URL": f"http://127.0.0.1:{stub_port}",
+        "CREEM_API_KEY": "bench",
+        "CREEM_WEBHOOK_SECRET": WEBHOOK_SECRET,
+        "CREEM_PRODUCT_IDS": json.dumps(PRODUCT_IDS),
+        # Every virtual user shares one IP, so per-IP limits would throttle the whole run
+        "RATE_LIMIT_ENABLED": "true" if args.rate_limits else "false",
+    }
+    if args.workers > 1:
+        os.makedirs(os.path.join(tmp, "prometheus"))
+        app_env["PROMETHEUS_MULTIPROC_DIR"] = os.path.join(tmp, "prometheus")
+    server = _start("app.main:app", app_port, app_env, workers=args.workers)
+    try:
+        await _wait_ready(f"http://127.0.0.1:{stub_port}/stats")
+        await _wait_ready(f"http://127.0.0.1:{app_port}/health")
+        limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{app_port}", limits=limits, timeout=120) as client:
+            test = LoadTest(client, args)
+            await test.setup()
+            async with httpx.AsyncClient() as stub_client:
+                before = (await stub_client.get(f"http://127.0.0.1:{stub_port}/stats")).json()
+                elapsed = await test.run()
+                after = (await stub_client.get(f"http://127.0.0.1:{stub_port}/stats")).json()
+    finally:
+        server.terminate()
+        stub.terminate()
+        server.wait()
+        stub.wait()
+
+    report = {
+        "commit": _git_commit(),
+        "config": {
+            "duration_s": args.duration, "users": args.users, "workers": args.workers, "mix": args.mix,
+            "llm_latency_ms": args.llm_latency_ms, "llm_latency_sigma": args.llm_latency_sigma,
+            "llm_malformed_rate": args.llm_malformed_rate, "llm_completion_tokens": args.llm_completion_tokens,
+        },
+        "elapsed_s": round(elapsed, 2),
+        **test.report(elapsed),
+        # Made during the measured window, including background evaluations that finished in it
+        "llm_proxy": {key: after.get(key, 0) - before.get(key, 0) for key in after},
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = _compare(report, json.load(f))
+    return report
+
+def _parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        op, _, weight = part.partition("=")
+        if op not in {"create", "get", "submit", "results", "webhook"}:
+            raise argparse.ArgumentTypeError(f"unknown operation: {op}")
+        mix[op] = float(weight or 1)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("create=1,get=20,submit=5,results=2,webhook=1"))
+    parser.add_argument("--seed-interviews", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the app's rate limits enabled")
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--llm-latency-sigma", type=float, default=0.5)
+    parser.add_argument("--llm-malformed-rate", type=float, default=0)
+    parser.add_argument("--llm-completion-tokens", type=int, default=400)
+    parser.add_argument("--output", help="Also write the report to this file")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(bench(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Local stand-ins for the LLM proxy and the Creem API, for benchmarks.
+
+Implements POST /v1/chat/completions (plain and `stream: true`) and
+POST /v1/checkouts. Responses are shaped after the prompts in
+app.services.ai_service, so questions and evaluations parse like real ones.
+
+Behaviour is set through environment variables:
+    STUB_LATENCY_MS         median LLM latency (default 800)
+    STUB_LATENCY_SIGMA      lognormal sigma of the latency (default 0.5; 0 = constant)
+    STUB_COMPLETION_TOKENS  completion tokens reported per response (default 400)
+    STUB_MALFORMED_RATE     fraction of responses that are not valid JSON (default 0)
+    STUB_ERROR_RATE         fraction of requests answered with a 503 (default 0)
+
+GET /stats returns request and token counters, so runs can compare how many
+LLM calls the service made.
+
+Usage (from backend/):
+    python -m uvicorn benchmarks.stub_services:app --port 9100
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import uuid
+from collections import Counter
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "800"))
+LATENCY_SIGMA = float(os.getenv("STUB_LATENCY_SIGMA", "0.5"))
+COMPLETION_TOKENS = int(os.getenv("STUB_COMPLETION_TOKENS", "400"))
+MALFORMED_RATE = float(os.getenv("STUB_MALFORMED_RATE", "0"))
+ERROR_RATE = float(os.getenv("STUB_ERROR_RATE", "0"))
+
+app = FastAPI()
+stats: Counter[str] = Counter()
+
+def _latency() -> float:
+    return LATENCY_MS / 1000 * random.lognormvariate(0, LATENCY_SIGMA) if LATENCY_SIGMA else LATENCY_MS / 1000
+
+def _score() -> int:
+    return random.choice([2, 3, 3, 4, 4, 5])
+
+def _evaluation(question_ids: list[int]) -> dict:
+    scores = [{"question_id": q, "score": _score(), "comment": "Relevant, could be more specific."} for q in question_ids]
+    overall = round(sum(s["score"] for s in scores) / max(len(scores), 1), 1)
+    return {
+        "scores": scores,
+        "overall_score": overall,
+        "recommendation": "recommend" if overall >= 4 else "maybe" if overall >= 3 else "not_recommended",
+        "summary": "The candidate gave structured answers with some concrete examples."
+    }
+
+def _content(prompt: str) -> str:
+    """Answer in the shape the prompt asks for."""
+    if "Generate 6 screening interview questions" in prompt:
+        return json.dumps([
+            {"id": i, "text": f"Describe a time you handled challenge {i}.", "expected_focus": f"Specific example of skill {i}"}
+            for i in range(1, 7)
+        ])
+    if "scoring one answer" in prompt:
+        return json.dumps({"score": _score(), "comment": "Relevant, could be more specific."})
+    if "summarizing a candidate" in prompt:
+        return "The candidate gave structured answers with some concrete examples."
+    question_ids = sorted({int(q) for q in re.findall(r"^A(\d+):", prompt, re.M)}) or [1]
+    if "several candidates" in prompt:
+        candidates = len(re.findall(r"^Candidate \d+:", prompt, re.M))
+        return json.dumps([{"candidate": i, **_evaluation(question_ids)} for i in range(1, candidates + 1)])
+    return json.dumps(_evaluation(question_ids))
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    prompt = body["messages"][0]["content"]
+    stats["chat_completions"] += 1
+    stats["prompt_chars"] += len(prompt)
+
+    if random.random() < ERROR_RATE:
+        stats["errors"] += 1
+        return JSONResponse({"error": "overloaded"}, status_code=503)
+
+    content = "This is not JSON." if random.random() < MALFORMED_RATE else _content(prompt)
+    usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": COMPLETION_TOKENS}
+    stats["completion_tokens"] += COMPLETION_TOKENS
+    latency = _latency()
+
+    if body.get("stream"):
+        async def events():
+            chunks = [content[i:i + 40] for i in range(0, len(content), 40)]
+            for chunk in chunks:
+                await asyncio.sleep(latency / len(chunks))
+                yield f"data: {json.dumps({'choices': [{'delta': {'content': chunk}}]})}\n\n"
+            yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(latency)
+    return {"choices": [{"message": {"content": content}}], "usage": usage}
+
+@app.post("/v1/checkouts")
+async def create_checkout(request: Request):
+    body = await request.json()
+    stats["checkouts"] += 1
+    await asyncio.sleep(0.05)
+    checkout_id = f"ch_{uuid.uuid4().hex}"
+    return {
+        "id": checkout_id,
+        "checkout_url": f"https://checkout.example/{checkout_id}",
+        "product_id": body.get("product_id"),
+        "metadata": body.get("metadata", {})
+    }
+
+@app.get("/stats")
+async def get_stats():
+    return dict(stats)
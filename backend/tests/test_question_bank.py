@@ -0,0 +1,56 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from app.services import question_bank
+
+BACKEND = ("Backend Engineer", "Design and operate Python services on Kubernetes with PostgreSQL", ["kubernetes", "python"])
+PLATFORM = ("Platform Engineer", "Operate Python services on Kubernetes and PostgreSQL in production", ["kubernetes", "python"])
+DESIGNER = ("Graphic Designer", "Brand identities and marketing material in Figma", ["figma"])
+
+BACKEND_QUESTIONS = [
+    "Walk us through a Python service you designed end to end.",
+    "How do you roll out a schema change in PostgreSQL without downtime?",
+    "Describe a conflict with a teammate and how you resolved it.",
+    "How would you debug a pod that keeps restarting in Kubernetes?",
+]
+PLATFORM_QUESTIONS = [
+    "Describe a conflict with a teammate and how you resolved it together.",
+    "How do you size resource requests and limits for a new workload?",
+    "What do you monitor first when latency of a service doubles?",
+    "Tell us about an incident you led and what changed afterwards.",
+]
+DESIGNER_QUESTIONS = [f"Design question {n} about typography and colour?" for n in range(1, 7)]
+
+def _rows():
+    specs = [(BACKEND, BACKEND_QUESTIONS), (PLATFORM, PLATFORM_QUESTIONS), (DESIGNER, DESIGNER_QUESTIONS)]
+    rows = []
+    for (title, requirements, skills), questions in specs:
+        for text in questions:
+            rows.append(SimpleNamespace(
+                id=len(rows) + 1, job_title=title, job_requirements=requirements,
+                key_skills=skills, text=text, expected_focus=""
+            ))
+    return rows
+
+def _find(monkeypatch, spec):
+    corpus = question_bank._Corpus()
+    corpus.extend(_rows())
+    monkeypatch.setattr(question_bank, "_index", question_bank._build_index(corpus))
+    # Keep find() from scheduling a refresh from the database
+    monkeypatch.setattr(question_bank, "_refreshed_at", time.monotonic())
+    return asyncio.run(question_bank.find(*spec))
+
+def test_identical_spec_reuses_its_own_questions_first(monkeypatch):
+    questions = _find(monkeypatch, BACKEND)
+    assert questions is not None
+    assert [q["text"] for q in questions[:4]] == BACKEND_QUESTIONS
+    assert [q["id"] for q in questions] == [1, 2, 3, 4, 5, 6]
+
+def test_near_duplicate_questions_are_not_both_returned(monkeypatch):
+    texts = [q["text"] for q in _find(monkeypatch, BACKEND)]
+    assert BACKEND_QUESTIONS[2] in texts
+    assert PLATFORM_QUESTIONS[0] not in texts
+    assert len(set(texts)) == len(texts) == 6
+
+def test_unrelated_spec_is_a_miss(monkeypatch):
+    assert _find(monkeypatch, ("Pastry Chef", "Croissants and laminated dough", ["baking"])) is None
@@ -26,6 +26,7 @@ export async function createInterview(data: {
   job_title: string;
   job_requirements: string;
   key_skills: string[];
+  use_cache?: boolean;
 }) {
   const deviceId = await getDeviceId();
   const response = await fetch(`${API_BASE}/interviews`, {
@@ -39,15 +40,70 @@ export async function createInterview(data: {
   return handleResponse(response);
 }
 
+export async function createInterviewStream(
+  data: {
+    job_title: string;
+    job_requirements: string;
+    key_skills: string[];
+    use_cache?: boolean;
+  },
+  onQuestion: (question: { id: number; text: string; expected_focus: string }) => void,
+) {
+  // Server-Sent Events over POST: `question` events arrive as they are generated, then `done` or `error`
+  const deviceId = await getDeviceId();
+  const response = await fetch(`${API_BASE}/interviews/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'X-Device-Id': deviceId,
+    },
+    body: JSON.stringify(data),
+  });
+  if (!response.ok || !response.body) {
+    return handleResponse(response);
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const event = message.match(/^event: (.*)$/m)?.[1];
+      const payload = JSON.parse(message.match(/^data: (.*)$/m)?.[1] ?? '{}');
+      if (event === 'question') onQuestion(payload);
+      else if (event === 'done') return payload;
+      else if (event === 'error') throw new Error(payload.detail || 'Request failed');
+    }
+  }
+  throw new Error('Request failed');
+}
+
 export async function getInterview(id: string) {
   const response = await fetch(`${API_BASE}/interviews/${id}`);
   return handleResponse(response);
 }
 
+export async function saveDraftAnswer(interviewId: string, draftId: string, questionId: number, answer: string) {
+  const response = await fetch(`${API_BASE}/interviews/${interviewId}/drafts/${draftId}/answers/${questionId}`, {
+    method: 'PUT',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ answer }),
+  });
+  return handleResponse(response);
+}
+
 export async function submitAnswers(interviewId: string, data: {
   candidate_name: string;
   candidate_email: string;
   answers: Array<{ question_id: number; answer: string }>;
+  draft_id?: string;
 }) {
   const response = await fetch(`${API_BASE}/interviews/${interviewId}/submit`, {
     method: 'POST',
@@ -59,11 +115,39 @@ export async function submitAnswers(interviewId: string, data: {
   return handleResponse(response);
 }
 
-export async function getResults(interviewId: string, code: string) {
-  const response = await fetch(`${API_BASE}/interviews/${interviewId}/results?code=${code}`);
+export async function getSubmissionStatus(interviewId: string, submissionId: string) {
+  const response = await fetch(`${API_BASE}/interviews/${interviewId}/submissions/${submissionId}/status`);
   return handleResponse(response);
 }
 
+export async function getResults(interviewId: string, code: string, options: { cursor?: string; limit?: number } = {}) {
+  // One page, best score first, without answers and scores; pass next_cursor back for the next page
+  const params = new URLSearchParams({ code, include_details: 'false' });
+  if (options.cursor) params.set('cursor', options.cursor);
+  if (options.limit) params.set('limit', String(options.limit));
+  const response = await fetch(`${API_BASE}/interviews/${interviewId}/results?${params}`);
+  return handleResponse(response);
+}
+
+export async function getSubmissionDetails(interviewId: string, submissionId: string, code: string) {
+  const response = await fetch(
+    `${API_BASE}/interviews/${interviewId}/submissions/${submissionId}?code=${encodeURIComponent(code)}`
+  );
+  return handleResponse(response);
+}
+
+export async function searchSubmissions(interviewId: string, code: string, query: string, offset = 0) {
+  // Snippets come back HTML-escaped with matches wrapped in <mark>
+  const params = new URLSearchParams({ code, q: query, offset: String(offset) });
+  const response = await fetch(`${API_BASE}/interviews/${interviewId}/search?${params}`);
+  return handleResponse(response);
+}
+
+export function exportResultsUrl(interviewId: string, code: string, format: 'csv' | 'ndjson' = 'csv') {
+  // Streamed download; the browser saves it directly
+  return `${API_BASE}/interviews/${interviewId}/export?code=${encodeURIComponent(code)}&format=${format}`;
+}
+
 export async function createCheckout(productId: string) {
   const deviceId = await getDeviceId();
   const response = await fetch(`${API_BASE}/payment/checkout`, {
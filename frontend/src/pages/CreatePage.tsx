@@ -1,7 +1,7 @@
 import { useState } from 'react';
 import { useTranslation } from 'react-i18next';
 import { Loader2, Copy, Check, ExternalLink } from 'lucide-react';
-import { createInterview } from '../lib/api';
+import { createInterviewStream } from '../lib/api';
 
 interface InterviewResult {
   id: string;
@@ -16,6 +16,7 @@ export default function CreatePage() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [result, setResult] = useState<InterviewResult | null>(null);
+  const [streamed, setStreamed] = useState<InterviewResult['questions']>([]);
   const [copiedLink, setCopiedLink] = useState<string | null>(null);
 
   const [formData, setFormData] = useState({
@@ -28,13 +29,14 @@ export default function CreatePage() {
     e.preventDefault();
     setLoading(true);
     setError(null);
+    setStreamed([]);
 
     try {
-      const data = await createInterview({
+      const data = await createInterviewStream({
         job_title: formData.jobTitle,
         job_requirements: formData.requirements,
         key_skills: formData.skills.split(',').map(s => s.trim()).filter(Boolean),
-      });
+      }, (question) => setStreamed(prev => [...prev, question]));
       setResult(data);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to create interview');
@@ -208,6 +210,16 @@ export default function CreatePage() {
               t('create.submit')
             )}
           </button>
+
+          {loading && streamed.length > 0 && (
+            <div className="space-y-2">
+              {streamed.map((q, i) => (
+                <div key={i} className="p-3 bg-zinc-800 rounded-lg text-sm">
+                  <span className="text-green-400 font-medium">Q{q.id}:</span> {q.text}
+                </div>
+              ))}
+            </div>
+          )}
         </form>
       </div>
     </div>
@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react';
 import { useParams } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
 import { Loader2, CheckCircle, AlertCircle } from 'lucide-react';
-import { getInterview, submitAnswers } from '../lib/api';
+import { getInterview, saveDraftAnswer, submitAnswers } from '../lib/api';
 
 interface Question {
   id: number;
@@ -15,6 +15,16 @@ interface InterviewData {
   questions: Question[];
 }
 
+function getDraftId(interviewId: string): string {
+  // One draft per interview per browser tab, so answers saved on blur are reused on submit
+  const key = `draft_id:${interviewId}`;
+  const stored = sessionStorage.getItem(key);
+  if (stored) return stored;
+  const draftId = crypto.randomUUID();
+  sessionStorage.setItem(key, draftId);
+  return draftId;
+}
+
 export default function InterviewPage() {
   const { id } = useParams<{ id: string }>();
   const { t } = useTranslation();
@@ -50,6 +60,13 @@ export default function InterviewPage() {
     fetchInterview();
   }, [id, t]);
 
+  const saveDraft = (questionId: number) => {
+    const answer = formData.answers[questionId];
+    if (!answer?.trim()) return;
+    // Best effort: anything not saved here is scored on submit
+    saveDraftAnswer(id!, getDraftId(id!), questionId, answer).catch(() => {});
+  };
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     setSubmitting(true);
@@ -65,6 +82,7 @@ export default function InterviewPage() {
         candidate_name: formData.name,
         candidate_email: formData.email,
         answers,
+        draft_id: getDraftId(id!),
       });
 
       setSubmitted(true);
@@ -164,6 +182,7 @@ export default function InterviewPage() {
                   ...formData,
                   answers: { ...formData.answers, [question.id]: e.target.value }
                 })}
+                onBlur={() => saveDraft(question.id)}
                 placeholder={t('interview.answerPlaceholder')}
                 className="textarea h-32"
                 required
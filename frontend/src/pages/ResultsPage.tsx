@@ -1,8 +1,8 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { useParams, useSearchParams } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
-import { Loader2, AlertCircle, Users, ThumbsUp, HelpCircle, ThumbsDown, ChevronDown, ChevronUp } from 'lucide-react';
-import { getResults } from '../lib/api';
+import { Loader2, AlertCircle, Users, ThumbsUp, HelpCircle, ThumbsDown, ChevronDown, ChevronUp, Download, Search, X, Clock } from 'lucide-react';
+import { getResults, getSubmissionDetails, getSubmissionStatus, exportResultsUrl, searchSubmissions } from '../lib/api';
 
 interface Submission {
   id: string;
@@ -11,9 +11,20 @@ interface Submission {
   overall_score: number;
   recommendation: string;
   ai_summary: string;
+  submitted_at: string;
+}
+
+interface SubmissionDetails {
   scores: Array<{ question_id: number; score: number; comment: string }>;
   answers: Array<{ question_id: number; answer: string }>;
-  submitted_at: string;
+}
+
+interface SearchHit {
+  submission_id: string;
+  candidate_name: string;
+  overall_score: number;
+  matched_in: 'answers' | 'comments' | 'summary';
+  snippet: string;
 }
 
 interface ResultsData {
@@ -25,14 +36,22 @@ interface ResultsData {
     created_at: string;
   };
   submissions: Submission[];
+  next_cursor: string | null;
   summary: {
     total: number;
     recommended: number;
     maybe: number;
     not_recommended: number;
+    pending: number;
   };
 }
 
+// While evaluations are pending, check on them this often and reload the results once one finishes
+const PENDING_POLL_MS = 5000;
+const PENDING_POLL_MAX = 20;
+// The server returns at most this many submissions per page
+const MAX_PAGE_SIZE = 500;
+
 export default function ResultsPage() {
   const { id } = useParams<{ id: string }>();
   const [searchParams] = useSearchParams();
@@ -42,20 +61,107 @@ export default function ResultsPage() {
   const [error, setError] = useState<string | null>(null);
   const [results, setResults] = useState<ResultsData | null>(null);
   const [expandedCandidates, setExpandedCandidates] = useState<Set<string>>(new Set());
+  const [query, setQuery] = useState('');
+  const [searching, setSearching] = useState(false);
+  const [searchError, setSearchError] = useState<string | null>(null);
+  const [hits, setHits] = useState<{ total: number; hits: SearchHit[] } | null>(null);
+  const [pendingChecks, setPendingChecks] = useState(0);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Answers and scores, loaded when a candidate is first expanded
+  const [details, setDetails] = useState<Record<string, SubmissionDetails>>({});
+  const detailsRequested = useRef<Set<string>>(new Set());
+
+  const fetchResults = useCallback(async (loaded = 0) => {
+    try {
+      // A reload keeps as many candidates listed as were loaded before
+      const data: ResultsData = await getResults(id!, code, loaded ? { limit: Math.min(loaded, MAX_PAGE_SIZE) } : {});
+      setResults(data);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : t('results.accessDenied'));
+    } finally {
+      setLoading(false);
+    }
+  }, [id, code, t]);
 
   useEffect(() => {
-    const fetchResults = async () => {
-      try {
-        const data = await getResults(id!, code);
-        setResults(data);
-      } catch (err) {
-        setError(err instanceof Error ? err.message : t('results.accessDenied'));
-      } finally {
-        setLoading(false);
-      }
-    };
     fetchResults();
-  }, [id, code, t]);
+  }, [fetchResults]);
+
+  useEffect(() => {
+    const pending = results?.submissions.filter((s) => s.recommendation === 'pending').slice(0, PENDING_POLL_MAX) ?? [];
+    if (pending.length === 0) return;
+    const timer = setTimeout(async () => {
+      const statuses = await Promise.all(
+        pending.map((s) => getSubmissionStatus(id!, s.id).catch(() => null))
+      );
+      if (statuses.some((status) => status && status.status !== 'pending')) {
+        // Details fetched while pending have no scores yet
+        setDetails((current) => {
+          const kept = { ...current };
+          for (const submission of pending) delete kept[submission.id];
+          return kept;
+        });
+        fetchResults(results!.submissions.length);
+      } else {
+        setPendingChecks((n) => n + 1);
+      }
+    }, PENDING_POLL_MS);
+    return () => clearTimeout(timer);
+  }, [results, pendingChecks, id, fetchResults]);
+
+  useEffect(() => {
+    for (const candidateId of expandedCandidates) {
+      if (details[candidateId] || detailsRequested.current.has(candidateId)) continue;
+      detailsRequested.current.add(candidateId);
+      getSubmissionDetails(id!, candidateId, code)
+        .then((data: SubmissionDetails) => setDetails((current) => ({ ...current, [candidateId]: data })))
+        .catch(() => {
+          // Collapse again so the next click retries
+          setExpandedCandidates((current) => {
+            const next = new Set(current);
+            next.delete(candidateId);
+            return next;
+          });
+        })
+        .finally(() => detailsRequested.current.delete(candidateId));
+    }
+  }, [expandedCandidates, details, id, code]);
+
+  const runSearch = async (e: React.FormEvent) => {
+    e.preventDefault();
+    if (!query.trim()) return;
+    setSearching(true);
+    setSearchError(null);
+    try {
+      setHits(await searchSubmissions(id!, code, query.trim()));
+    } catch (err) {
+      setSearchError(err instanceof Error ? err.message : t('results.searchFailed'));
+    } finally {
+      setSearching(false);
+    }
+  };
+
+  const clearSearch = () => {
+    setQuery('');
+    setHits(null);
+    setSearchError(null);
+  };
+
+  const loadMore = async () => {
+    if (!results?.next_cursor) return;
+    setLoadingMore(true);
+    try {
+      const page: ResultsData = await getResults(id!, code, { cursor: results.next_cursor });
+      setResults((current) => current && {
+        ...page,
+        submissions: [...current.submissions, ...page.submissions],
+      });
+    } catch (err) {
+      setError(err instanceof Error ? err.message : t('results.accessDenied'));
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const toggleCandidate = (candidateId: string) => {
     const newExpanded = new Set(expandedCandidates);
@@ -75,6 +181,8 @@ export default function ResultsPage() {
         return <span className="badge badge-maybe"><HelpCircle className="w-4 h-4 mr-1" /> {t('results.maybe')}</span>;
       case 'not_recommended':
         return <span className="badge badge-not-recommended"><ThumbsDown className="w-4 h-4 mr-1" /> {t('results.notRecommended')}</span>;
+      case 'pending':
+        return <span className="badge badge-pending"><Clock className="w-4 h-4 mr-1" /> {t('results.pending')}</span>;
       default:
         return null;
     }
@@ -106,10 +214,13 @@ export default function ResultsPage() {
         <div className="text-center mb-8">
           <h1 className="text-3xl font-bold mb-2">{t('results.title')}</h1>
           <p className="text-xl text-green-400">{results?.interview.job_title}</p>
+          <a href={exportResultsUrl(id!, code)} className="btn-secondary inline-flex mt-4" download>
+            <Download className="w-4 h-4" /> {t('results.exportCsv')}
+          </a>
         </div>
 
         {/* Summary Cards */}
-        <div className="grid grid-cols-2 md:grid-cols-4 gap-4 mb-8">
+        <div className="grid grid-cols-2 md:grid-cols-5 gap-4 mb-8">
           <div className="card text-center">
             <Users className="w-8 h-8 text-zinc-400 mx-auto mb-2" />
             <div className="text-2xl font-bold">{results?.summary.total}</div>
@@ -130,8 +241,53 @@ export default function ResultsPage() {
             <div className="text-2xl font-bold text-red-400">{results?.summary.not_recommended}</div>
             <div className="text-sm text-zinc-400">{t('results.notRecommended')}</div>
           </div>
+          <div className="card text-center">
+            <Clock className="w-8 h-8 text-zinc-400 mx-auto mb-2" />
+            <div className="text-2xl font-bold text-zinc-300">{results?.summary.pending}</div>
+            <div className="text-sm text-zinc-400">{t('results.pending')}</div>
+          </div>
         </div>
 
+        {/* Full-text search */}
+        <form onSubmit={runSearch} className="card mb-8">
+          <div className="flex gap-2">
+            <input
+              type="search"
+              value={query}
+              onChange={(e) => setQuery(e.target.value)}
+              placeholder={t('results.searchPlaceholder')}
+              className="input flex-1"
+              maxLength={200}
+            />
+            <button type="submit" className="btn-primary" disabled={searching}>
+              {searching ? <Loader2 className="w-4 h-4 animate-spin" /> : <Search className="w-4 h-4" />}
+            </button>
+            {hits && (
+              <button type="button" className="btn-secondary" onClick={clearSearch} aria-label={t('results.clearSearch')}>
+                <X className="w-4 h-4" />
+              </button>
+            )}
+          </div>
+          {searchError && <p className="text-sm text-red-400 mt-3">{searchError}</p>}
+          {hits && (
+            <div className="mt-4 space-y-3">
+              <p className="text-sm text-zinc-400">
+                {hits.total === 0 ? t('results.searchNoHits') : t('results.searchHits', { count: hits.total })}
+              </p>
+              {hits.hits.map((hit) => (
+                <div key={hit.submission_id} className="border-t border-zinc-800 pt-3">
+                  <div className="flex justify-between text-sm">
+                    <span className="font-medium">{hit.candidate_name}</span>
+                    <span className="text-zinc-400">{hit.overall_score.toFixed(1)}</span>
+                  </div>
+                  {/* Escaped by the server; only <mark> tags are markup */}
+                  <p className="text-sm text-zinc-300 mt-1" dangerouslySetInnerHTML={{ __html: hit.snippet }} />
+                </div>
+              ))}
+            </div>
+          )}
+        </form>
+
         {/* Candidates List */}
         {results?.submissions.length === 0 ? (
           <div className="card text-center py-12">
@@ -157,7 +313,9 @@ export default function ResultsPage() {
                   </div>
                   <div className="flex items-center gap-4">
                     <div className="text-right">
-                      <div className="text-2xl font-bold">{submission.overall_score.toFixed(1)}</div>
+                      <div className="text-2xl font-bold">
+                        {submission.recommendation === 'pending' ? '–' : submission.overall_score.toFixed(1)}
+                      </div>
                       <div className="text-xs text-zinc-400">{t('results.score')}</div>
                     </div>
                     {getRecommendationBadge(submission.recommendation)}
@@ -180,10 +338,15 @@ export default function ResultsPage() {
                     {/* Answers & Scores */}
                     <div>
                       <h4 className="text-sm font-medium text-zinc-400 mb-3">{t('results.answers')}</h4>
+                      {!details[submission.id] ? (
+                        <div className="flex justify-center py-4">
+                          <Loader2 className="w-6 h-6 animate-spin text-green-500" />
+                        </div>
+                      ) : (
                       <div className="space-y-4">
                         {results.interview.questions.map((q) => {
-                          const answer = submission.answers.find(a => a.question_id === q.id);
-                          const score = submission.scores.find(s => s.question_id === q.id);
+                          const answer = details[submission.id].answers.find(a => a.question_id === q.id);
+                          const score = details[submission.id].scores.find(s => s.question_id === q.id);
                           return (
                             <div key={q.id} className="p-4 bg-zinc-800 rounded-lg">
                               <div className="flex justify-between items-start mb-2">
@@ -202,11 +365,17 @@ export default function ResultsPage() {
                           );
                         })}
                       </div>
+                      )}
                     </div>
                   </div>
                 )}
               </div>
             ))}
+            {results?.next_cursor && (
+              <button type="button" className="btn-secondary w-full flex justify-center" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? <Loader2 className="w-4 h-4 animate-spin" /> : t('results.loadMore')}
+              </button>
+            )}
           </div>
         )}
       </div>